@@ -0,0 +1,137 @@
+import argparse
+import glob
+import json
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from maze_solver import ALGORITHMS, MazeSolver
+from solution_cache import SolutionCache
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+MAZE_PATTERNS = ("*.txt", "*.maze")
+
+def find_mazes(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            filenames = []
+            for pattern in MAZE_PATTERNS:
+                filenames.extend(glob.glob(os.path.join(path, pattern)))
+            yield from sorted(filenames)
+        elif glob.has_magic(path):
+            yield from sorted(glob.glob(path))
+        else:
+            yield path
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def process_peak_rss_kb():
+    # The peak resident size of this whole worker process so far. Workers
+    # solve many mazes, so it never goes down and is not one maze's peak;
+    # --trace-memory records that per solve as peak_memory.
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def solve_file(filename, algorithms, trace_memory, cache_dir=None, profile=False, parallel_workers=None):
+    try:
+        solver = MazeSolver(filename, packed=True)
+        if cache_dir is not None:
+            solver.solution_cache = SolutionCache(cache_dir)
+    except Exception as e:
+        return [{"file": filename, "error": str(e)}]
+
+    solver.trace_memory = trace_memory
+    solver.profile = profile
+    solver.workers = parallel_workers
+    results = []
+    for algorithm in algorithms:
+        # One failing solve (a missing optional dependency, say) is reported
+        # on its own line instead of losing the rest of the chunk.
+        try:
+            cells, stats = solver.measure_solve(algorithm)
+        except Exception as e:
+            results.append({"file": filename, "algorithm": algorithm, "error": str(e)})
+            continue
+        result = {
+            "file": filename,
+            "algorithm": algorithm,
+            "width": solver.width,
+            "height": solver.height,
+            "solved": cells is not None,
+            "path_length": stats.path_length,
+            "num_explored": stats.num_explored,
+            "peak_frontier": stats.peak_frontier,
+            "load_time": stats.parse_time,
+            "wall_time": stats.search_time,
+            "cached": stats.cached,
+            "process_peak_rss_kb": process_peak_rss_kb()
+        }
+        if trace_memory:
+            result["peak_memory"] = stats.peak_memory
+        if profile:
+            result["profile"] = stats.profile
+        results.append(result)
+    return results
+
+def solve_chunk(filenames, algorithms, trace_memory, cache_dir=None, profile=False, parallel_workers=None):
+    results = []
+    for filename in filenames:
+        results.extend(solve_file(filename, algorithms, trace_memory, cache_dir, profile, parallel_workers))
+    return results
+
+def write_results(futures, output):
+    for future in futures:
+        for result in future.result():
+            output.write(json.dumps(result) + "\n")
+    output.flush()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve maze files in parallel and print one JSON line per maze and algorithm.")
+    parser.add_argument("paths", nargs="+", help="Maze files, directories or glob patterns.")
+    parser.add_argument("-a", "--algorithms", default="bfs",
+                        help=f"Comma separated list of algorithms ({', '.join(ALGORITHMS)}). Default: bfs.")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count(), help="Number of worker processes.")
+    parser.add_argument("--parallel-workers", type=int, default=1,
+                        help="Processes used by each solve of the parallel algorithm. Default: 1, since files "
+                             "are already solved in parallel.")
+    parser.add_argument("-c", "--chunk-size", type=int, default=16, help="Maze files per submitted task.")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Record each solve's peak Python allocation with tracemalloc (slower).")
+    parser.add_argument("--cache-dir", help="Reuse solutions stored in this directory and add new ones to it.")
+    parser.add_argument("--profile", action="store_true",
+                        help="Sample each solve and add its hottest lines to the result.")
+    args = parser.parse_args(argv)
+
+    algorithms = [name.strip() for name in args.algorithms.split(",") if name.strip()]
+    unknown = [name for name in algorithms if name not in ALGORITHMS]
+    if unknown:
+        parser.error(f"unknown algorithm(s): {', '.join(unknown)}")
+
+    # Only a bounded number of chunks is in flight at once, so huge
+    # directories are never expanded into futures all at the same time.
+    max_pending = max(1, args.workers) * 2
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        pending = set()
+        for chunk in chunked(find_mazes(args.paths), args.chunk_size):
+            pending.add(executor.submit(solve_chunk, chunk, algorithms, args.trace_memory, args.cache_dir, args.profile,
+                                           args.parallel_workers))
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                write_results(done, sys.stdout)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            write_results(done, sys.stdout)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from hierarchical import AbstractGraph
+from maze_generator import FAMILIES, generate_maze, write_maze
+from maze_solver import ALGORITHMS, JunctionGraph, MazeSolver
+
+def default_algorithms():
+    # The NumPy solver is only benchmarked by default when NumPy is installed.
+    has_numpy = importlib.util.find_spec("numpy") is not None
+    return [name for name in ALGORITHMS if name != "numpy" or has_numpy]
+
+def measure(operation, repeat, trace_memory):
+    # Best wall time over repeat runs, plus the tracemalloc peak of one extra
+    # untimed run so tracing never distorts the timings.
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = operation()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    peak_memory = None
+    if trace_memory:
+        tracemalloc.start()
+        result = operation()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return best, peak_memory, result
+
+def qt_window():
+    # Only imported on request so the benchmark itself never needs Qt.
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+    from ui_main import MainWindow
+    application = QApplication.instance() or QApplication(sys.argv[:1])
+    window = MainWindow()
+    window.resize(1200, 900)
+    window.show()
+    application.processEvents()
+    return application, window
+
+def draw_in_window(window, solver):
+    window.solver = solver
+    window.draw_maze()
+
+def cold_solve(solver, algorithm, workers=None):
+    # The LPA* planner is dropped first, otherwise every repeat after the
+    # first would time a repair with nothing to do.
+    if algorithm == "lpastar":
+        solver.planner = None
+    return solver.solve(algorithm, workers)
+
+def cells_of(solver, algorithm):
+    cells = cold_solve(solver, algorithm)
+    return [cell for cell in cells or () if cell not in (solver.start, solver.goal)]
+
+def run_case(family, size, seed, algorithms, repeat, trace_memory, directory, window=None, workers=None,
+             parallel_min_frontier=None):
+    # With a list of worker counts, the parallel solver is timed once per
+    # count as parallel/<workers>.
+    filename = os.path.join(directory, f"{family}-{size}.txt")
+    write_maze(filename, generate_maze(family, size, size, seed), size)
+
+    results = {}
+    elapsed, peak_memory, solver = measure(lambda: MazeSolver(filename, packed=True), repeat, trace_memory)
+    results["load_maze"] = {"time": elapsed, "peak_memory": peak_memory}
+    if parallel_min_frontier is not None:
+        solver.parallel_min_frontier = parallel_min_frontier
+
+    elapsed, peak_memory, _ = measure(solver.grid.pixels, repeat, trace_memory)
+    results["render"] = {"time": elapsed, "peak_memory": peak_memory}
+
+    if window is not None:
+        elapsed, peak_memory, _ = measure(lambda: draw_in_window(window, solver), repeat, trace_memory)
+        results["qt_render"] = {"time": elapsed, "peak_memory": peak_memory}
+
+    if "junction" in algorithms:
+        # Graph construction is timed on its own; the "junction" solve below
+        # reuses the cached graph, as repeated queries on one maze would.
+        elapsed, peak_memory, graph = measure(lambda: JunctionGraph(solver.grid, solver.start, solver.goal), repeat, trace_memory)
+        solver.junctions = graph
+        results["junction_build"] = {
+            "time": elapsed,
+            "peak_memory": peak_memory,
+            "compression_ratio": graph.compression_ratio
+        }
+
+    if "hpa" in algorithms:
+        # Likewise for the HPA* abstract graph, which would normally be read
+        # back from next to the maze file.
+        elapsed, peak_memory, graph = measure(lambda: AbstractGraph(solver.grid), repeat, trace_memory)
+        solver.hierarchy = graph
+        results["hpa_build"] = {"time": elapsed, "peak_memory": peak_memory}
+
+    runs = []
+    for algorithm in algorithms:
+        if algorithm == "parallel" and workers:
+            runs += [(f"parallel/{count}", algorithm, count) for count in workers]
+        else:
+            runs.append((algorithm, algorithm, None))
+    for operation, algorithm, count in runs:
+        elapsed, peak_memory, cells = measure(lambda: cold_solve(solver, algorithm, count), repeat, trace_memory)
+        results[operation] = {
+            "time": elapsed,
+            "peak_memory": peak_memory,
+            "num_explored": solver.num_explored,
+            "path_length": len(cells) if cells is not None else None
+        }
+
+    path = cells_of(solver, "lpastar") if "lpastar" in algorithms else None
+    if path:
+        # Incremental cost: every run toggles one cell in the middle of the
+        # path and lets the planner repair its previous search.
+        row, col = path[len(path) // 2]
+        def toggle_and_solve():
+            solver.set_wall(row, col, not solver.grid.is_wall(row, col))
+            return solver.solve("lpastar")
+        elapsed, peak_memory, _ = measure(toggle_and_solve, repeat, trace_memory)
+        results["lpastar_edit"] = {
+            "time": elapsed,
+            "peak_memory": peak_memory,
+            "num_explored": solver.num_explored
+        }
+        solver.set_wall(row, col, False)
+    os.remove(filename)
+    return results
+
+def compare(results, baseline, threshold, min_time):
+    # Returns the operations whose time grew by more than threshold times the
+    # baseline; timings below min_time seconds are too noisy to compare.
+    regressions = []
+    for case, operations in results.items():
+        for operation, result in operations.items():
+            previous = baseline.get(case, {}).get(operation)
+            if previous is None or max(previous["time"], result["time"]) < min_time:
+                continue
+            ratio = result["time"] / max(previous["time"], 1e-9)
+            if ratio > threshold:
+                regressions.append((case, operation, previous["time"], result["time"], ratio))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark MazeSolver on generated mazes.")
+    parser.add_argument("--families", default=",".join(FAMILIES),
+                        help=f"Comma separated maze families ({', '.join(FAMILIES)}).")
+    parser.add_argument("--sizes", default="10,100,500",
+                        help="Comma separated maze sizes, from 10 up to 5000. Default: 10,100,500.")
+    parser.add_argument("--algorithms", default=",".join(default_algorithms()),
+                        help=f"Comma separated algorithms ({', '.join(ALGORITHMS)}).")
+    parser.add_argument("--workers",
+                        help="Comma separated process counts to time the parallel algorithm with, e.g. 1,2,4,8. "
+                             "Default: one run with a process per core.")
+    parser.add_argument("--parallel-min-frontier", type=int,
+                        help="Smallest BFS level the parallel algorithm hands to its processes.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per operation; the best is kept.")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc peak memory runs.")
+    parser.add_argument("--qt-render", action="store_true",
+                        help="Also time MainWindow.draw_maze (QT_QPA_PLATFORM defaults to offscreen).")
+    parser.add_argument("--baseline", help="JSON baseline to compare against.")
+    parser.add_argument("--save", help="Write the results to this JSON file.")
+    parser.add_argument("--threshold", type=float, default=1.5,
+                        help="Fail when an operation is this many times slower than the baseline. Default: 1.5.")
+    parser.add_argument("--min-time", type=float, default=0.005,
+                        help="Ignore operations faster than this many seconds in the comparison.")
+    args = parser.parse_args(argv)
+
+    families = [name for name in args.families.split(",") if name]
+    algorithms = [name for name in args.algorithms.split(",") if name]
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    workers = [int(count) for count in (args.workers or "").split(",") if count]
+    for name in families:
+        if name not in FAMILIES:
+            parser.error(f"unknown maze family: {name}")
+    for name in algorithms:
+        if name not in ALGORITHMS:
+            parser.error(f"unknown algorithm: {name}")
+
+    window = None
+    if args.qt_render:
+        application, window = qt_window()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for family in families:
+            for size in sizes:
+                case = f"{family}/{size}"
+                results[case] = run_case(family, size, args.seed, algorithms, args.repeat, not args.no_memory, directory,
+                                         window, workers, args.parallel_min_frontier)
+                for operation, result in results[case].items():
+                    memory = "" if result["peak_memory"] is None else f" {result['peak_memory'] / 1024:10.0f} KiB"
+                    explored = f" explored {result['num_explored']}" if "num_explored" in result else ""
+                    ratio = f" compression {result['compression_ratio']:.1f}x" if "compression_ratio" in result else ""
+                    print(f"{case:20} {operation:15} {result['time'] * 1000:10.2f} ms{memory}{explored}{ratio}", flush=True)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold, args.min_time)
+        for case, operation, before, after, ratio in regressions:
+            print(f"REGRESSION {case} {operation}: {before * 1000:.2f} ms -> {after * 1000:.2f} ms ({ratio:.2f}x)")
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,9 @@
+import argparse
+from maze_solver import convert_maze
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert a maze between the text and binary (.maze) formats.")
+    parser.add_argument("source", help="Text or binary maze file to read.")
+    parser.add_argument("destination", help="File to write; a .maze extension selects the binary format.")
+    args = parser.parse_args()
+    convert_maze(args.source, args.destination)
@@ -0,0 +1,336 @@
+import heapq
+import os
+import struct
+import tempfile
+from array import array
+from collections import deque
+
+from maze_solver import grid_digest
+
+HPA_MAGIC = b"MHPA"
+HPA_VERSION = 1
+# magic, version, width, height, cluster size, SHA-256 of the walls
+HPA_HEADER = struct.Struct("<4sHxxIII32s")
+DEFAULT_CLUSTER_SIZE = 64
+# Entrances at least this wide get a transition at each end instead of one
+# in the middle, which keeps abstract paths close to optimal.
+ENTRANCE_SPLIT = 6
+
+def graph_path(filename, cluster_size):
+    return f"{filename}.c{cluster_size}.hpa"
+
+class AbstractGraph:
+    # HPA*: the grid is cut into cluster_size x cluster_size clusters. Every
+    # open stretch of a cluster border becomes one or two transitions (a pair
+    # of adjacent cells on either side), and each cluster stores the
+    # distances between its own transition cells. Queries search this small
+    # graph first and only then run BFS inside the clusters the path crosses.
+    def __init__(self, grid, cluster_size=DEFAULT_CLUSTER_SIZE, build=True):
+        self.grid = grid
+        self.cluster_size = cluster_size
+        self.cluster_rows = -(-grid.height // cluster_size)
+        self.cluster_cols = -(-grid.width // cluster_size)
+        # borders[key] lists the (inside, outside) transitions of a border,
+        # keyed ("h", row, col) for the border with the cluster to the right
+        # and ("v", row, col) for the one below.
+        self.borders = {}
+        # edges[cluster][node] lists (node, distance) inside the cluster.
+        self.edges = {}
+        self.transitions = {}
+        # The most entries the frontier held during the last search().
+        self.peak_frontier = 0
+        if build:
+            for key in self.border_keys():
+                self.build_border(key)
+            for cluster in self.clusters():
+                self.build_cluster(cluster)
+
+    def clusters(self):
+        for row in range(self.cluster_rows):
+            for col in range(self.cluster_cols):
+                yield (row, col)
+
+    def border_keys(self):
+        for row, col in self.clusters():
+            if col + 1 < self.cluster_cols:
+                yield ("h", row, col)
+            if row + 1 < self.cluster_rows:
+                yield ("v", row, col)
+
+    def cluster_of(self, index):
+        row, col = divmod(index, self.grid.stride)
+        return ((row - 1) // self.cluster_size, (col - 1) // self.cluster_size)
+
+    def cluster_nodes(self, cluster):
+        row, col = cluster
+        nodes = set()
+        for key, side in (
+            (("h", row, col), 0), (("h", row, col - 1), 1),
+            (("v", row, col), 0), (("v", row - 1, col), 1)
+        ):
+            for pair in self.borders.get(key, ()):
+                nodes.add(pair[side])
+        return nodes
+
+    def build_border(self, key):
+        kind, row, col = key
+        size = self.cluster_size
+        grid = self.grid
+        for a, b in self.borders.get(key, ()):
+            self.transitions[a].discard(b)
+            self.transitions[b].discard(a)
+
+        if kind == "h":
+            edge = (col + 1) * size - 1
+            cells = [(grid.index(r, edge), grid.index(r, edge + 1))
+                     for r in range(row * size, min((row + 1) * size, grid.height))]
+        else:
+            edge = (row + 1) * size - 1
+            cells = [(grid.index(edge, c), grid.index(edge + 1, c))
+                     for c in range(col * size, min((col + 1) * size, grid.width))]
+
+        pairs = []
+        run = []
+        for a, b in cells + [(None, None)]:
+            if a is not None and not grid.cells[a] and not grid.cells[b]:
+                run.append((a, b))
+                continue
+            if len(run) >= ENTRANCE_SPLIT:
+                pairs += [run[0], run[-1]]
+            elif run:
+                pairs.append(run[len(run) // 2])
+            run = []
+
+        self.borders[key] = pairs
+        for a, b in pairs:
+            self.transitions.setdefault(a, set()).add(b)
+            self.transitions.setdefault(b, set()).add(a)
+
+    def local_grid(self, cluster):
+        # The cluster's walls copied into a small bordered grid, so searches
+        # inside it never need a bounds check. Returns (cells, stride, origin)
+        # where origin is the global index of the cluster's top-left cell.
+        grid = self.grid
+        size = self.cluster_size
+        top, left = cluster[0] * size, cluster[1] * size
+        height = min(size, grid.height - top)
+        width = min(size, grid.width - left)
+        stride = width + 2
+        cells = bytearray(b"\x01") * (stride * (height + 2))
+        for row in range(height):
+            values = grid.span(grid.index(top + row, left), width)
+            cells[(row + 1) * stride + 1:(row + 1) * stride + 1 + width] = values
+        return cells, stride, grid.index(top, left)
+
+    def to_local(self, index, stride, origin):
+        row, col = divmod(index - origin, self.grid.stride)
+        return (row + 1) * stride + col + 1
+
+    def to_global(self, local, stride, origin):
+        row, col = divmod(local, stride)
+        return origin + (row - 1) * self.grid.stride + col - 1
+
+    def cluster_search(self, local, source):
+        # BFS from the global index source within one local_grid(). Returns
+        # distances (-1 when unreachable) and parents over local indices,
+        # with the source as its own parent.
+        cells, stride, origin = local
+        offsets = (-stride, stride, -1, 1)
+        distances = array("i", [-1]) * len(cells)
+        parents = array("i", [-1]) * len(cells)
+        start = self.to_local(source, stride, origin)
+        distances[start] = 0
+        parents[start] = start
+        queue = deque([start])
+        while queue:
+            index = queue.popleft()
+            distance = distances[index] + 1
+            for offset in offsets:
+                neighbor = index + offset
+                if not cells[neighbor] and distances[neighbor] < 0:
+                    distances[neighbor] = distance
+                    parents[neighbor] = index
+                    queue.append(neighbor)
+        return distances, parents
+
+    def distances_within(self, local, source, targets):
+        _, stride, origin = local
+        distances, _ = self.cluster_search(local, source)
+        result = []
+        for target in targets:
+            if target == source:
+                continue
+            distance = distances[self.to_local(target, stride, origin)]
+            if distance >= 0:
+                result.append((target, distance))
+        return result
+
+    def build_cluster(self, cluster):
+        nodes = self.cluster_nodes(cluster)
+        local = self.local_grid(cluster)
+        self.edges[cluster] = {node: self.distances_within(local, node, nodes) for node in nodes}
+
+    def update_cell(self, index):
+        # Rebuilds the borders the cell lies on and the clusters that share
+        # them; everything else in the graph is unaffected by the edit.
+        size = self.cluster_size
+        cluster = self.cluster_of(index)
+        row, col = self.grid.state(index)
+        row, col = row % size, col % size
+        keys = []
+        if row == size - 1 and cluster[0] + 1 < self.cluster_rows:
+            keys.append((("v", cluster[0], cluster[1]), (cluster[0] + 1, cluster[1])))
+        if row == 0 and cluster[0] > 0:
+            keys.append((("v", cluster[0] - 1, cluster[1]), (cluster[0] - 1, cluster[1])))
+        if col == size - 1 and cluster[1] + 1 < self.cluster_cols:
+            keys.append((("h", cluster[0], cluster[1]), (cluster[0], cluster[1] + 1)))
+        if col == 0 and cluster[1] > 0:
+            keys.append((("h", cluster[0], cluster[1] - 1), (cluster[0], cluster[1] - 1)))
+
+        rebuilt = {cluster}
+        for key, neighbor in keys:
+            self.build_border(key)
+            rebuilt.add(neighbor)
+        for affected in rebuilt:
+            self.build_cluster(affected)
+        return rebuilt
+
+    def search(self, start, goal):
+        # A* over the transitions with the start and goal temporarily linked
+        # into their clusters. Returns (abstract path, expanded nodes).
+        start_cluster = self.cluster_of(start)
+        goal_cluster = self.cluster_of(goal)
+        targets = self.cluster_nodes(start_cluster)
+        if goal_cluster == start_cluster:
+            targets.add(goal)
+        start_edges = self.distances_within(self.local_grid(start_cluster), start, targets)
+        goal_nodes = self.cluster_nodes(goal_cluster)
+        goal_edges = dict(self.distances_within(self.local_grid(goal_cluster), goal, goal_nodes))
+
+        parents = {start: None}
+        costs = {start: 0}
+        closed = set()
+        frontier = [(self.grid.distance(start, goal), 0, 0, start)]
+        count = 0
+        self.peak_frontier = 1
+        while frontier:
+            _, _, _, node = heapq.heappop(frontier)
+            if node in closed:
+                continue
+            closed.add(node)
+            if node == goal:
+                path = []
+                while node is not None:
+                    path.append(node)
+                    node = parents[node]
+                path.reverse()
+                return path, len(closed)
+
+            if node == start:
+                edges = list(start_edges)
+            else:
+                edges = list(self.edges[self.cluster_of(node)].get(node, ()))
+                if node in goal_edges:
+                    edges.append((goal, goal_edges[node]))
+            edges += [(neighbor, 1) for neighbor in self.transitions.get(node, ())]
+
+            cost = costs[node]
+            for neighbor, weight in edges:
+                neighbor_cost = cost + weight
+                if neighbor in closed or costs.get(neighbor, neighbor_cost + 1) <= neighbor_cost:
+                    continue
+                costs[neighbor] = neighbor_cost
+                parents[neighbor] = node
+                count += 1
+                heapq.heappush(frontier, (neighbor_cost + self.grid.distance(neighbor, goal), -neighbor_cost, count, neighbor))
+            if len(frontier) > self.peak_frontier:
+                self.peak_frontier = len(frontier)
+        return None, len(closed)
+
+    def refine(self, path):
+        # Expands an abstract path into (actions, cells), searching only
+        # inside the clusters it passes through.
+        indices = [path[0]]
+        for node, following in zip(path, path[1:]):
+            if following in self.transitions.get(node, ()):
+                indices.append(following)
+                continue
+            local = self.local_grid(self.cluster_of(node))
+            _, stride, origin = local
+            _, parents = self.cluster_search(local, node)
+            segment = self.grid.trace(parents, self.to_local(following, stride, origin))
+            indices += (self.to_global(index, stride, origin) for index in reversed(segment[:-1]))
+        return self.grid.path(indices)
+
+    def save(self, filename):
+        # Written to a temporary file first so readers never see a partial
+        # graph.
+        body = array("i")
+        for key in self.border_keys():
+            pairs = self.borders[key]
+            body.append(len(pairs))
+            for pair in pairs:
+                body.extend(pair)
+        for cluster in self.clusters():
+            edges = self.edges[cluster]
+            body.append(len(edges))
+            for node, targets in edges.items():
+                body.append(node)
+                body.append(len(targets))
+                for target in targets:
+                    body.extend(target)
+
+        descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(filename) or ".", suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as f:
+                f.write(HPA_HEADER.pack(
+                    HPA_MAGIC, HPA_VERSION, self.grid.width, self.grid.height,
+                    self.cluster_size, grid_digest(self.grid)
+                ))
+                body.tofile(f)
+            os.replace(temporary, filename)
+        except BaseException:
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
+            raise
+
+    @classmethod
+    def load(cls, filename, grid, cluster_size=DEFAULT_CLUSTER_SIZE):
+        # Returns None when the file is missing, truncated or was built for
+        # different walls or another cluster size.
+        try:
+            with open(filename, "rb") as f:
+                header = f.read(HPA_HEADER.size)
+                body = array("i")
+                body.frombytes(f.read())
+        except (OSError, ValueError):
+            return None
+        if len(header) != HPA_HEADER.size:
+            return None
+        magic, version, width, height, size, digest = HPA_HEADER.unpack(header)
+        if (magic, version, width, height, size) != (HPA_MAGIC, HPA_VERSION, grid.width, grid.height, cluster_size):
+            return None
+        if digest != grid_digest(grid):
+            return None
+
+        graph = cls(grid, cluster_size, build=False)
+        values = iter(body)
+        try:
+            for key in graph.border_keys():
+                pairs = [(next(values), next(values)) for _ in range(next(values))]
+                graph.borders[key] = pairs
+                for a, b in pairs:
+                    graph.transitions.setdefault(a, set()).add(b)
+                    graph.transitions.setdefault(b, set()).add(a)
+            for cluster in graph.clusters():
+                edges = graph.edges[cluster] = {}
+                for _ in range(next(values)):
+                    node = next(values)
+                    edges[node] = [(next(values), next(values)) for _ in range(next(values))]
+        except StopIteration:
+            return None
+        if next(values, None) is not None:
+            return None
+        return graph
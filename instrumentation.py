@@ -0,0 +1,76 @@
+import sys
+import threading
+import time
+from collections import Counter
+
+class SolveStats:
+    # What one MazeSolver.solve() measured. Times are in seconds; peak_memory
+    # is the peak traced allocation in bytes and is None unless the solver's
+    # trace_memory is set, and profile is None unless its profile is set.
+    # peak_frontier is the most entries the search's frontier (its queue,
+    # heap or wavefront) held at once, and None for cached results.
+    def __init__(self, algorithm, parse_time, search_time, num_explored, peak_frontier,
+                 peak_memory=None, path_length=None, cached=False, profile=None):
+        self.algorithm = algorithm
+        self.parse_time = parse_time
+        self.search_time = search_time
+        self.num_explored = num_explored
+        self.peak_frontier = peak_frontier
+        self.peak_memory = peak_memory
+        self.path_length = path_length
+        self.cached = cached
+        self.profile = profile
+
+    def as_dict(self):
+        return {
+            "algorithm": self.algorithm,
+            "parse_time": self.parse_time,
+            "search_time": self.search_time,
+            "num_explored": self.num_explored,
+            "peak_frontier": self.peak_frontier,
+            "peak_memory": self.peak_memory,
+            "path_length": self.path_length,
+            "cached": self.cached,
+            "profile": self.profile
+        }
+
+class SamplingProfiler:
+    # Samples the innermost frame of the thread that called start() from a
+    # background thread every interval seconds. It has no cost on the
+    # profiled code itself, unlike cProfile; top() lists the hottest lines.
+    def __init__(self, interval=0.001):
+        self.interval = interval
+        self.samples = Counter()
+        self.thread = None
+        self.target = None
+        self.running = threading.Event()
+
+    def start(self):
+        self.target = threading.get_ident()
+        self.running.set()
+        self.thread = threading.Thread(target=self.sample, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running.clear()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def sample(self):
+        # Samples arrive at most once per interpreter switch interval
+        # (sys.getswitchinterval(), 5 ms by default) while the target holds
+        # the GIL.
+        while True:
+            time.sleep(self.interval)
+            if not self.running.is_set():
+                return
+            frame = sys._current_frames().get(self.target)
+            if frame is not None:
+                code = frame.f_code
+                self.samples[(code.co_name, code.co_filename, frame.f_lineno)] += 1
+            del frame
+
+    def top(self, limit=10):
+        # [(function, filename, line, samples), ...] with the most samples first.
+        return [(name, filename, line, count) for (name, filename, line), count in self.samples.most_common(limit)]
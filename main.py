@@ -1,11 +1,81 @@
-from PyQt5.QtWidgets import QApplication
-from welcome import WelcomeWindow
+import time
+
+STARTED = time.perf_counter()
+
+import argparse
+import os
 import sys
 
+def current_rss_kb():
+    # Resident memory now, from /proc where available, otherwise the peak.
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:  # Not available on Windows
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def format_rss():
+    # Right-aligned in ten columns; "n/a" where the platform cannot tell.
+    rss = current_rss_kb()
+    return f"{'n/a':>10}" if rss is None else f"{rss:10} KiB"
+
+def measure_startup(app, round_trips):
+    # Reports the time from process start to the first paint of any widget,
+    # then navigates Welcome -> Main -> Welcome round_trips times and reports
+    # resident memory and the number of top-level widgets after each trip.
+    from PyQt5.QtCore import QEvent, QObject
+    import navigation
+
+    class FirstPaint(QObject):
+        def __init__(self):
+            super().__init__()
+            self.elapsed = None
+
+        def eventFilter(self, watched, event):
+            if self.elapsed is None and event.type() == QEvent.Paint:
+                self.elapsed = time.perf_counter() - STARTED
+            return False
+
+    first_paint = FirstPaint()
+    app.installEventFilter(first_paint)
+    navigation.show_welcome()
+    while first_paint.elapsed is None:
+        app.processEvents()
+    app.removeEventFilter(first_paint)
+    print(f"first paint       {first_paint.elapsed * 1000:10.1f} ms")
+    print(f"rss at start      {format_rss()}")
+
+    for trip in range(1, round_trips + 1):
+        navigation.welcome_window().start_application()
+        app.processEvents()
+        navigation.main_window().return_to_home()
+        app.processEvents()
+        print(f"rss after trip {trip:<3}{format_rss()}, {len(app.topLevelWidgets())} top-level widgets")
+
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    
-    welcome_window = WelcomeWindow()
-    welcome_window.show()
-    
+    parser = argparse.ArgumentParser(description="Maze solver application.")
+    parser.add_argument("--measure-startup", action="store_true",
+                        help="Print the time to first paint and memory after navigation round trips, then exit. "
+                             "Runs on the offscreen platform unless QT_QPA_PLATFORM is set.")
+    parser.add_argument("--round-trips", type=int, default=10,
+                        help="Welcome/Main round trips for --measure-startup. Default: 10.")
+    args, qt_args = parser.parse_known_args()
+    if args.measure_startup:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    from PyQt5.QtWidgets import QApplication
+    import navigation
+
+    app = QApplication(sys.argv[:1] + qt_args)
+    if args.measure_startup:
+        measure_startup(app, args.round_trips)
+        sys.exit(0)
+
+    navigation.show_welcome()
+
     sys.exit(app.exec_())
@@ -0,0 +1,154 @@
+import argparse
+import random
+
+# Generators return the maze as a flat row-major bytearray of text cells
+# (b"#", b" ", b"A" and b"B"), so even 5000x5000 mazes are built with slice
+# assignments rather than one Python object per cell.
+WALL = ord("#")
+OPEN = ord(" ")
+
+def place_endpoints(cells, width, start, goal):
+    cells[start[0] * width + start[1]] = ord("A")
+    cells[goal[0] * width + goal[1]] = ord("B")
+    return cells
+
+def generate_backtracker(width, height, seed=0):
+    # Perfect maze carved by an iterative recursive backtracker: rooms sit on
+    # odd coordinates and exactly one path joins any two of them.
+    if width < 3 or height < 3 or max(width, height) < 5:
+        raise ValueError("Backtracker mazes must be at least 3x5.")
+    rnd = random.Random(seed)
+    cells = bytearray([WALL]) * (width * height)
+    rooms_wide = (width - 1) // 2
+    rooms_high = (height - 1) // 2
+    visited = bytearray(rooms_wide * rooms_high)
+    directions = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+    visited[0] = 1
+    cells[width + 1] = OPEN
+    stack = [(0, 0)]
+    while stack:
+        row, col = stack[-1]
+        choices = []
+        for d_row, d_col in directions:
+            next_row, next_col = row + d_row, col + d_col
+            if 0 <= next_row < rooms_high and 0 <= next_col < rooms_wide and not visited[next_row * rooms_wide + next_col]:
+                choices.append((next_row, next_col))
+        if not choices:
+            stack.pop()
+            continue
+        next_row, next_col = rnd.choice(choices)
+        visited[next_row * rooms_wide + next_col] = 1
+        cells[(row + next_row + 1) * width + col + next_col + 1] = OPEN
+        cells[(2 * next_row + 1) * width + 2 * next_col + 1] = OPEN
+        stack.append((next_row, next_col))
+
+    return place_endpoints(cells, width, (1, 1), (2 * rooms_high - 1, 2 * rooms_wide - 1))
+
+def generate_rooms(width, height, seed=0, room_size=16):
+    # Large open rooms separated by one-cell walls, with one door in every
+    # wall segment between two neighboring rooms.
+    if width < 2 or height < 2:
+        raise ValueError("Room mazes must be at least 2x2.")
+    rnd = random.Random(seed)
+    cells = bytearray([OPEN]) * (width * height)
+    wall_rows = range(room_size, height - 1, room_size + 1)
+    wall_cols = range(room_size, width - 1, room_size + 1)
+    for row in wall_rows:
+        cells[row * width:(row + 1) * width] = bytes([WALL]) * width
+    for col in wall_cols:
+        cells[col::width] = bytes([WALL]) * height
+
+    row_edges = [0] + [row + 1 for row in wall_rows] + [height + 1]
+    col_edges = [0] + [col + 1 for col in wall_cols] + [width + 1]
+    for top, bottom in zip(row_edges, row_edges[1:]):
+        for left, right in zip(col_edges, col_edges[1:]):
+            # Doors in the wall to the right of and below this room.
+            if right <= width:
+                door = rnd.randrange(top, bottom - 1)
+                cells[door * width + right - 1] = OPEN
+            if bottom <= height:
+                door = rnd.randrange(left, right - 1)
+                cells[(bottom - 1) * width + door] = OPEN
+
+    return place_endpoints(cells, width, (0, 0), (height - 1, width - 1))
+
+def generate_random(width, height, seed=0, density=0.3):
+    # Independent random walls; mazes at high densities may have no solution.
+    # The two cells next to each corner endpoint are kept open so A and B are
+    # not walled in by chance.
+    rnd = random.Random(seed)
+    threshold = int(density * 256)
+    table = bytes(WALL if byte < threshold else OPEN for byte in range(256))
+    cells = bytearray(rnd.randbytes(width * height).translate(table))
+    for index in (1, width, width * height - 2, width * (height - 1) - 1):
+        if 0 <= index < len(cells):
+            cells[index] = OPEN
+    return place_endpoints(cells, width, (0, 0), (height - 1, width - 1))
+
+def generate_spiral(width, height, seed=0):
+    # A single one-cell-wide corridor winding inwards from the top left, the
+    # longest possible path for its area.
+    if width < 3 or height < 3 or max(width, height) < 4:
+        raise ValueError("Spiral mazes must be at least 3x4.")
+    cells = bytearray([WALL]) * (width * height)
+    top, left, bottom, right = 1, 1, height - 2, width - 2
+    entry = 1
+    end = (1, 1)
+    while top <= bottom and left <= right:
+        cells[top * width + entry:top * width + right + 1] = bytes([OPEN]) * (right - entry + 1)
+        end = (top, right)
+        if bottom > top:
+            cells[(top + 1) * width + right:(bottom + 1) * width + right:width] = bytes([OPEN]) * (bottom - top)
+            end = (bottom, right)
+            if right > left:
+                cells[bottom * width + left:bottom * width + right] = bytes([OPEN]) * (right - left)
+                end = (bottom, left)
+                if bottom - 1 >= top + 2:
+                    cells[(top + 2) * width + left:bottom * width + left:width] = bytes([OPEN]) * (bottom - top - 2)
+                    end = (top + 2, left)
+                else:
+                    break
+            else:
+                break
+        else:
+            break
+        entry = left
+        top, left, bottom, right = top + 2, left + 2, bottom - 2, right - 2
+    return place_endpoints(cells, width, (1, 1), end)
+
+FAMILIES = {
+    "backtracker": generate_backtracker,
+    "rooms": generate_rooms,
+    "random": generate_random,
+    "spiral": generate_spiral
+}
+
+def generate_maze(family, width, height, seed=0, **options):
+    if family not in FAMILIES:
+        raise ValueError(f"Unknown maze family {family!r}, expected one of {', '.join(FAMILIES)}.")
+    return FAMILIES[family](width, height, seed, **options)
+
+def write_maze(filename, cells, width):
+    with open(filename, "wb") as f:
+        for start in range(0, len(cells), width):
+            f.write(cells[start:start + width])
+            f.write(b"\n")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a deterministic maze in the text format.")
+    parser.add_argument("family", choices=FAMILIES)
+    parser.add_argument("width", type=int)
+    parser.add_argument("height", type=int)
+    parser.add_argument("output", help="Text maze file to write.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--density", type=float, help="Wall density for random mazes.")
+    parser.add_argument("--room-size", type=int, help="Room size for room mazes.")
+    args = parser.parse_args()
+
+    options = {}
+    if args.density is not None:
+        options["density"] = args.density
+    if args.room_size is not None:
+        options["room_size"] = args.room_size
+    write_maze(args.output, generate_maze(args.family, args.width, args.height, args.seed, **options), args.width)
@@ -1,6 +1,80 @@
+import functools
+import hashlib
+import heapq
+import logging
+import mmap
 import os
+import struct
+import time
+import tracemalloc
+from array import array
+from collections import Counter, OrderedDict, deque
+from instrumentation import SamplingProfiler, SolveStats
 
+logger = logging.getLogger(__name__)
+
+# Binary maze format: a fixed header followed by one bit per cell of the
+# bordered grid (the same layout as PackedGrid.cells), least significant bit
+# first, so a file can be memory-mapped and used without any parsing.
+BINARY_MAGIC = b"MAZB"
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct("<4sHxxIIIIII")
+
+# Text cells map to 0 (open) for ' ', 'A' and 'B' and to 1 (wall) otherwise.
+WALL_TABLE = bytes(0 if chr(byte) in " AB" else 1 for byte in range(256))
+TEXT_TABLE = bytes.maketrans(b"\x00\x01", b" #")
+BIT_TABLE = bytes.maketrans(b"\x00\x01", b"01")
+UNBIT_TABLE = bytes.maketrans(b"01", b"\x00\x01")
+BIT_CHUNK = 1 << 23
+
+# Search algorithms by the short name used by solve() and the command line tools.
+ALGORITHMS = {
+    "dfs": "solve_with_dfs",
+    "bfs": "solve_with_bfs",
+    "astar": "solve_with_astar",
+    "greedy": "solve_with_greedy",
+    "bidirectional": "solve_with_bidirectional_bfs",
+    "jps": "solve_with_jps",
+    "numpy": "solve_with_numpy_bfs",
+    "lpastar": "solve_with_lpastar",
+    "junction": "solve_with_junction_graph",
+    "hpa": "solve_with_hpa",
+    "parallel": "solve_with_parallel_bfs"
+}
+
+# Solvers call check_progress() once every PROGRESS_INTERVAL expansions.
+PROGRESS_INTERVAL = 1024
+
+# Algorithms that SearchStepper can run incrementally.
+STEPPABLE_ALGORITHMS = ("dfs", "bfs", "astar", "greedy")
+
+# Parallel BFS levels with fewer frontier cells than this are expanded in the
+# parent process, since handing them to the pool costs more than it saves.
+# MazeSolver.parallel_min_frontier overrides it per solver.
+PARALLEL_MIN_FRONTIER = 1024
+
+INFINITY = float("inf")
+
+OPPOSITE_ACTIONS = {"up": "down", "down": "up", "left": "right", "right": "left"}
+
+class SolveCancelled(Exception):
+    pass
+
+def import_numpy():
+    # NumPy is optional and only imported by the solvers that need it.
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("This solver requires NumPy, install it with 'pip install numpy'.") from None
+    return numpy
+
+# Node and the two frontiers are the original search building blocks. The
+# solvers no longer use them (search state lives in flat arrays indexed by
+# cell), but they stay importable for code written against them, with O(1)
+# add, remove and contains_state.
 class Node:
+    __slots__ = ("state", "parent", "action")
+
     def __init__(self, state, parent, action):
         self.state = state
         self.parent = parent
@@ -9,146 +83,1466 @@ class Node:
 class StackFrontier:
     def __init__(self):
         self.frontier = []
+        # How many nodes of each state are in the frontier, so membership
+        # never scans it.
+        self.states = Counter()
 
     def add(self, node):
         self.frontier.append(node)
+        self.states[node.state] += 1
 
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+        return state in self.states
 
     def empty(self):
         return len(self.frontier) == 0
 
+    def take(self):
+        return self.frontier.pop()
+
     def remove(self):
         if self.empty():
             raise Exception("Empty frontier")
         else:
-            return self.frontier.pop()
+            node = self.take()
+            self.states[node.state] -= 1
+            if not self.states[node.state]:
+                del self.states[node.state]
+            return node
 
 class QueueFrontier(StackFrontier):
-    def remove(self):
-        if self.empty():
-            raise Exception("Empty frontier")
+    def __init__(self):
+        super().__init__()
+        self.frontier = deque()
+
+    def take(self):
+        return self.frontier.popleft()
+
+class PackedGrid:
+    # Walls are stored one byte per cell in a flat row-major bytearray with a
+    # one-cell wall border, so every neighbor sits at a fixed index offset and
+    # never needs a bounds check.
+    def __init__(self, width, height, cells=None):
+        self.width = width
+        self.height = height
+        self.stride = width + 2
+        if cells is None:
+            cells = bytearray(b"\x01") * (self.stride * (height + 2))
+        self.cells = cells
+        self.offsets = (
+            ("up", -self.stride, -1, 0),
+            ("down", self.stride, 1, 0),
+            ("left", -1, 0, -1),
+            ("right", 1, 0, 1)
+        )
+        self.actions_by_step = {offset: action for action, offset, _, _ in self.offsets}
+
+    def index(self, row, col):
+        return (row + 1) * self.stride + col + 1
+
+    def state(self, index):
+        row, col = divmod(index, self.stride)
+        return (row - 1, col - 1)
+
+    def distance(self, first, second):
+        # Manhattan distance between two cell indices, the heuristic of every
+        # best-first search over the grid.
+        first_row, first_col = divmod(first, self.stride)
+        second_row, second_col = divmod(second, self.stride)
+        return abs(first_row - second_row) + abs(first_col - second_col)
+
+    def trace(self, links, index):
+        # Follows links (an array or dict mapping a cell index to the next
+        # one) from index up to the cell that links to itself, and returns
+        # every index visited, both ends included.
+        chain = [index]
+        following = links[index]
+        while following != index:
+            chain.append(following)
+            index = following
+            following = links[index]
+        return chain
+
+    def path(self, indices):
+        # Turns a walk of adjacent cell indices into an (actions, cells)
+        # solution; the first index is where the walk starts and is left out.
+        actions_by_step = self.actions_by_step
+        actions = []
+        cells = []
+        index = indices[0]
+        for following in indices[1:]:
+            actions.append(actions_by_step[following - index])
+            cells.append(self.state(following))
+            index = following
+        return (actions, cells)
+
+    def is_wall(self, row, col):
+        return bool(self.cells[self.index(row, col)])
+
+    def set_wall(self, row, col, blocked):
+        self.cells[self.index(row, col)] = 1 if blocked else 0
+
+    def set_row(self, row, values):
+        start = self.index(row, 0)
+        self.cells[start:start + self.width] = bytes(self.width)
+        self.cells[start:start + len(values)] = values
+
+    def span(self, start, count):
+        # count cells from the flat index start on, one byte per cell.
+        return memoryview(self.cells)[start:start + count]
+
+    def __len__(self):
+        return self.height
+
+    def __getitem__(self, row):
+        if row < 0:
+            row += self.height
+        if not 0 <= row < self.height:
+            raise IndexError("maze row out of range")
+        return self.span(self.index(row, 0), self.width)
+
+    def __iter__(self):
+        for row in range(self.height):
+            yield self[row]
+
+    def to_numpy(self):
+        # The bordered grid as a (height + 2, width + 2) uint8 array sharing
+        # this grid's memory; flat indices match PackedGrid.index().
+        numpy = import_numpy()
+        return numpy.frombuffer(self.cells, dtype=numpy.uint8).reshape(self.height + 2, self.stride)
+
+    def pixels(self, bytes_per_line=None):
+        # The walls without the border, one byte per cell (1 for walls), with
+        # each row padded to bytes_per_line so it can back an indexed image.
+        bytes_per_line = bytes_per_line or self.width
+        padding = bytes(bytes_per_line - self.width)
+        pixels = bytearray()
+        for row in self:
+            pixels += row
+            pixels += padding
+        return pixels
+
+class BitCells:
+    # Byte-per-cell view over a bit-packed buffer, indexed like PackedGrid.cells.
+    def __init__(self, buffer, size):
+        self.buffer = buffer
+        self.size = size
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        return (self.buffer[index >> 3] >> (index & 7)) & 1
+
+    def __setitem__(self, index, value):
+        if value:
+            self.buffer[index >> 3] |= 1 << (index & 7)
         else:
-            return self.frontier.pop(0)
+            self.buffer[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+
+class BitGrid(PackedGrid):
+    # A PackedGrid whose cells live one bit each in an external buffer, such
+    # as a memory-mapped binary maze file.
+    def __init__(self, width, height, buffer):
+        super().__init__(width, height, BitCells(buffer, (width + 2) * (height + 2)))
+
+    def set_row(self, row, values):
+        start = self.index(row, 0)
+        for col in range(self.width):
+            self.cells[start + col] = values[col] if col < len(values) else 0
+
+    def span(self, start, count):
+        # Unpacks only the bytes that hold the span, skipping the bits of
+        # the first byte that come before it.
+        skip = start & 7
+        packed = self.cells.buffer[start >> 3:(start + count + 7) >> 3]
+        return bytes(unpack_bits(packed, skip + count)[skip:])
+
+    def to_numpy(self):
+        # Unpacked into a new array, since bits cannot be viewed in place.
+        numpy = import_numpy()
+        size = len(self.cells)
+        packed = numpy.frombuffer(self.cells.buffer, dtype=numpy.uint8, count=(size + 7) // 8)
+        return numpy.unpackbits(packed, bitorder="little")[:size].reshape(self.height + 2, self.stride)
+
+class DistanceField:
+    # Breadth-first distances to one goal for every cell of a grid, plus the
+    # next cell index on a shortest path towards it (-1 where unreachable).
+    def __init__(self, grid, goal):
+        self.goal = goal
+        self.distances = array("i", [-1]) * len(grid.cells)
+        self.successors = array("i", [-1]) * len(grid.cells)
+        self.num_explored = 0
+
+        cells = grid.cells
+        offsets = [offset for _, offset, _, _ in grid.offsets]
+        distances = self.distances
+        successors = self.successors
+        root = grid.index(*goal)
+        distances[root] = 0
+        successors[root] = root
+        queue = deque([root])
+        while queue:
+            index = queue.popleft()
+            self.num_explored += 1
+            distance = distances[index] + 1
+            for offset in offsets:
+                neighbor = index + offset
+                if not cells[neighbor] and distances[neighbor] < 0:
+                    distances[neighbor] = distance
+                    successors[neighbor] = index
+                    queue.append(neighbor)
+
+class SearchStepper:
+    # A DFS, BFS, A* or greedy search that can be advanced a few expansions or
+    # a time budget at a time and resumed later with its frontier intact.
+    # The search state is kept in flat arrays indexed by PackedGrid cell index:
+    # the frontier holds plain ints, parents holds each cell's predecessor and
+    # the action of a step is recovered from the index delta.
+    def __init__(self, solver, algorithm):
+        if algorithm not in STEPPABLE_ALGORITHMS:
+            raise ValueError(f"Cannot step search algorithm {algorithm!r}, expected one of {', '.join(STEPPABLE_ALGORITHMS)}.")
+        self.solver = solver
+        self.grid = solver.grid
+        self.algorithm = algorithm
+        self.goal = self.grid.index(*solver.goal)
+        self.num_explored = 0
+        # The largest the frontier has been, checked after every expansion
+        # since that is the only time entries are pushed.
+        self.peak_frontier = 1
+        self.done = False
+        self.solution = None
+        self.reporting = False
+
+        size = len(self.grid.cells)
+        start = self.grid.index(*solver.start)
+        self.parents = array("i", [-1]) * size
+        # For DFS and BFS a cell is marked when it enters the frontier, which
+        # is exactly when the original frontier/explored checks start to
+        # reject it. For A* and greedy it is marked once expanded.
+        self.marked = bytearray(size)
+        self.parents[start] = start
+        if algorithm == "dfs":
+            self.frontier = [start]
+            self.marked[start] = 1
+        elif algorithm == "bfs":
+            self.frontier = deque([start])
+            self.marked[start] = 1
+        else:
+            self.costs = array("i", [-1]) * size
+            self.costs[start] = 0
+            self.count = 0
+            self.frontier = [(self.grid.distance(start, self.goal), 0, 0, start)]
+
+    def __iter__(self):
+        while not self.done:
+            yield self.step(PROGRESS_INTERVAL)
+
+    def frontier_size(self):
+        return len(self.frontier)
+
+    def step(self, max_expansions=None, time_budget=None):
+        # Expands at most max_expansions nodes and stops once time_budget
+        # seconds have passed; returns the states explored by this call.
+        batch = self.advance(max_expansions, time_budget, True)
+        return [self.grid.state(index) for index in batch]
+
+    def advance(self, max_expansions=None, time_budget=None, collect=False):
+        batch = []
+        if self.done:
+            return batch
+        deadline = None if time_budget is None else time.perf_counter() + time_budget
+        if self.algorithm in ("astar", "greedy"):
+            pop = self.pop_best_first
+            expand = self.expand_best_first
+        else:
+            pop = self.frontier.pop if self.algorithm == "dfs" else self.frontier.popleft
+            expand = self.expand_uninformed
+        frontier = self.frontier
+        goal = self.goal
+        peak = self.peak_frontier
+        expansions = 0
+
+        while max_expansions is None or expansions < max_expansions:
+            if not frontier:
+                self.done = True
+                break
+
+            index = pop()
+            if index < 0:
+                continue
+            self.num_explored += 1
+            expansions += 1
+            if collect:
+                batch.append(index)
+            if self.reporting and self.num_explored % PROGRESS_INTERVAL == 0:
+                self.solver.num_explored = self.num_explored
+                self.solver.check_progress(len(frontier))
+
+            if index == goal:
+                self.done = True
+                self.solution = self.path_to(goal)
+                break
+
+            expand(index)
+            if len(frontier) > peak:
+                peak = len(frontier)
+
+            if deadline is not None and expansions % 64 == 0 and time.perf_counter() >= deadline:
+                break
+        self.peak_frontier = peak
+        return batch
+
+    def expand_uninformed(self, index):
+        cells = self.grid.cells
+        marked = self.marked
+        parents = self.parents
+        frontier = self.frontier
+        for _, offset, _, _ in self.grid.offsets:
+            neighbor = index + offset
+            if not cells[neighbor] and not marked[neighbor]:
+                marked[neighbor] = 1
+                parents[neighbor] = index
+                frontier.append(neighbor)
+
+    def pop_best_first(self):
+        # Superseded heap entries are skipped by returning -1.
+        index = heapq.heappop(self.frontier)[-1]
+        if self.marked[index]:
+            return -1
+        self.marked[index] = 1
+        return index
+
+    def expand_best_first(self, index):
+        # A* orders the frontier by cost + heuristic, greedy best-first by the
+        # heuristic alone; ties go to the deeper node.
+        greedy = self.algorithm == "greedy"
+        cells = self.grid.cells
+        distance = self.grid.distance
+        goal = self.goal
+        marked = self.marked
+        costs = self.costs
+        parents = self.parents
+        cost = costs[index] + 1
+        for _, offset, _, _ in self.grid.offsets:
+            neighbor = index + offset
+            if cells[neighbor] or marked[neighbor]:
+                continue
+            if greedy:
+                if costs[neighbor] >= 0:
+                    continue
+            elif 0 <= costs[neighbor] <= cost:
+                continue
+            costs[neighbor] = cost
+            parents[neighbor] = index
+            priority = distance(neighbor, goal) if greedy else cost + distance(neighbor, goal)
+            self.count += 1
+            heapq.heappush(self.frontier, (priority, -cost, self.count, neighbor))
+
+    def path_to(self, index):
+        return self.grid.path(self.grid.trace(self.parents, index)[::-1])
+
+class IncrementalPlanner:
+    # Lifelong Planning A* between fixed start and goal cells on a grid with
+    # unit step costs. After walls change, update_cell() marks the affected
+    # cells and compute() repairs the previous search, only re-expanding the
+    # cells whose distance from the start actually changed.
+    def __init__(self, grid, start, goal):
+        self.grid = grid
+        self.start = grid.index(*start)
+        self.goal = grid.index(*goal)
+        self.offsets = [offset for _, offset, _, _ in grid.offsets]
+        self.g = {}
+        self.rhs = {self.start: 0}
+        self.queue = []
+        self.queued = {}
+        self.count = 0
+        # The longest the queue got during the last compute().
+        self.peak_frontier = 0
+        self.push(self.start)
+
+    def key(self, index):
+        best = min(self.g.get(index, INFINITY), self.rhs.get(index, INFINITY))
+        return (best + self.grid.distance(index, self.goal), best)
+
+    def push(self, index):
+        key = self.key(index)
+        self.queued[index] = key
+        self.count += 1
+        heapq.heappush(self.queue, (key, self.count, index))
+        if len(self.queue) > self.peak_frontier:
+            self.peak_frontier = len(self.queue)
+
+    def top(self):
+        # Drops heap entries whose cell was since dequeued or re-keyed.
+        while self.queue:
+            key, _, index = self.queue[0]
+            if self.queued.get(index) == key:
+                return key, index
+            heapq.heappop(self.queue)
+        return None, None
+
+    def update_vertex(self, index):
+        cells = self.grid.cells
+        if index != self.start:
+            best = INFINITY
+            if not cells[index]:
+                g = self.g
+                for offset in self.offsets:
+                    neighbor = index + offset
+                    if not cells[neighbor]:
+                        best = min(best, g.get(neighbor, INFINITY) + 1)
+            self.rhs[index] = best
+        self.queued.pop(index, None)
+        if self.g.get(index, INFINITY) != self.rhs.get(index, INFINITY):
+            self.push(index)
+
+    def update_cell(self, index):
+        self.update_vertex(index)
+        for offset in self.offsets:
+            self.update_vertex(index + offset)
+
+    def compute(self):
+        # Returns the number of cells expanded by this call.
+        expanded = 0
+        self.peak_frontier = len(self.queue)
+        g = self.g
+        rhs = self.rhs
+        goal = self.goal
+        while True:
+            key, index = self.top()
+            if key is None or (key >= self.key(goal) and rhs.get(goal, INFINITY) == g.get(goal, INFINITY)):
+                return expanded
+            heapq.heappop(self.queue)
+            del self.queued[index]
+            expanded += 1
+            if g.get(index, INFINITY) > rhs.get(index, INFINITY):
+                g[index] = rhs[index]
+            else:
+                g[index] = INFINITY
+                self.update_vertex(index)
+            for offset in self.offsets:
+                self.update_vertex(index + offset)
+
+    def path(self):
+        # Walks from the goal back to the start through the neighbor with the
+        # smallest distance from the start.
+        g = self.g
+        if g.get(self.goal, INFINITY) == INFINITY:
+            return None
+        cells = self.grid.cells
+        index = self.goal
+        indices = [index]
+        while index != self.start:
+            index = min((index + offset for offset in self.offsets if not cells[index + offset]),
+                        key=lambda neighbor: g.get(neighbor, INFINITY))
+            indices.append(index)
+        indices.reverse()
+        return self.grid.path(indices)
+
+class JunctionGraph:
+    # The maze contracted to its decision points: junctions, dead ends and the
+    # start and goal. Each corridor between two of them becomes one weighted
+    # edge that keeps its run of cells, so searches expand a handful of nodes
+    # instead of every corridor cell.
+    def __init__(self, grid, start, goal):
+        self.grid = grid
+        self.start = grid.index(*start)
+        self.goal = grid.index(*goal)
+        cells = grid.cells
+        offsets = [offset for _, offset, _, _ in grid.offsets]
+        stride = grid.stride
+
+        # Node detection: every open cell whose number of open neighbors
+        # is not two.
+        self.adjacency = {}
+        self.open_cells = 0
+        for row in range(grid.height):
+            index = (row + 1) * stride + 1
+            for index in range(index, index + grid.width):
+                if cells[index]:
+                    continue
+                self.open_cells += 1
+                degree = (not cells[index - stride]) + (not cells[index + stride]) + \
+                    (not cells[index - 1]) + (not cells[index + 1])
+                if degree != 2:
+                    self.adjacency[index] = []
+        for index in (self.start, self.goal):
+            self.adjacency.setdefault(index, [])
+
+        # Each corridor is walked from both ends but stored once, by the end
+        # with the lower index. runs[i] lists the corridor's cells from that
+        # end (exclusive) to the other end (inclusive).
+        self.runs = []
+        for node, edges in self.adjacency.items():
+            for offset in offsets:
+                index = node + offset
+                if cells[index]:
+                    continue
+                run = [index]
+                previous = node
+                while index not in self.adjacency:
+                    for step in offsets:
+                        following = index + step
+                        if following != previous and not cells[following]:
+                            break
+                    previous = index
+                    index = following
+                    run.append(index)
+                if index <= node:
+                    continue
+                # Adjacent nodes (the bulk of open rooms) need no stored run.
+                if len(run) == 1:
+                    run_id = None
+                else:
+                    self.runs.append(array("i", run))
+                    run_id = len(self.runs) - 1
+                edges.append((index, len(run), run_id, False))
+                self.adjacency[index].append((node, len(run), run_id, True))
+
+        self.num_nodes = len(self.adjacency)
+        self.num_edges = sum(len(edges) for edges in self.adjacency.values()) // 2
+        self.compression_ratio = self.open_cells / max(self.num_nodes, 1)
+        # The most entries the frontier held during the last search().
+        self.peak_frontier = 0
+
+    def search(self):
+        # A* over the junction graph; returns (path, expanded nodes) where
+        # path is the list of (node, run_id, reversed) steps or None.
+        parents = {self.start: None}
+        costs = {self.start: 0}
+        closed = set()
+        frontier = [(self.grid.distance(self.start, self.goal), 0, 0, self.start)]
+        count = 0
+        self.peak_frontier = 1
+        while frontier:
+            _, _, _, node = heapq.heappop(frontier)
+            if node in closed:
+                continue
+            closed.add(node)
+            if node == self.goal:
+                steps = []
+                while parents[node] is not None:
+                    previous, run_id, reversed_run = parents[node]
+                    steps.append((node, run_id, reversed_run))
+                    node = previous
+                steps.reverse()
+                return steps, len(closed)
+            cost = costs[node]
+            for neighbor, weight, run_id, reversed_run in self.adjacency[node]:
+                if neighbor in closed:
+                    continue
+                neighbor_cost = cost + weight
+                if neighbor in costs and costs[neighbor] <= neighbor_cost:
+                    continue
+                costs[neighbor] = neighbor_cost
+                parents[neighbor] = (node, run_id, reversed_run)
+                count += 1
+                heapq.heappush(frontier, (neighbor_cost + self.grid.distance(neighbor, self.goal), -neighbor_cost, count, neighbor))
+            if len(frontier) > self.peak_frontier:
+                self.peak_frontier = len(frontier)
+        return None, len(closed)
+
+    def expand(self, steps):
+        # Turns graph steps back into the full (actions, cells) cell path.
+        indices = [self.start]
+        for node, run_id, reversed_run in steps:
+            if run_id is None:
+                indices.append(node)
+            elif reversed_run:
+                indices += reversed(self.runs[run_id][:-1])
+                indices.append(node)
+            else:
+                indices += self.runs[run_id]
+        return self.grid.path(indices)
+
+# Worker-side state of solve_with_parallel_bfs(), set up once per process by
+# attach_parallel_search() so that no task ever pickles the maze.
+PARALLEL_SEARCH = {}
+
+def attach_parallel_search(names, offsets):
+    from multiprocessing import shared_memory
+    blocks = [shared_memory.SharedMemory(name=name) for name in names]
+    PARALLEL_SEARCH["blocks"] = blocks
+    PARALLEL_SEARCH["cells"] = blocks[0].buf
+    PARALLEL_SEARCH["distances"] = blocks[1].buf.cast("i")
+    PARALLEL_SEARCH["parents"] = blocks[2].buf.cast("i")
+    PARALLEL_SEARCH["frontier"] = blocks[3].buf.cast("i")
+    PARALLEL_SEARCH["offsets"] = offsets
+
+def expand_parallel_chunk(start, end, level):
+    # Expands frontier[start:end], claiming every unvisited neighbor in the
+    # shared distances and parents, and returns the claimed cells as this
+    # chunk's slice of the next level. Two workers that claim one cell at the
+    # same moment both write the same distance and a valid parent, so the
+    # race only costs that cell a second expansion.
+    cells = PARALLEL_SEARCH["cells"]
+    distances = PARALLEL_SEARCH["distances"]
+    parents = PARALLEL_SEARCH["parents"]
+    frontier = PARALLEL_SEARCH["frontier"]
+    offsets = PARALLEL_SEARCH["offsets"]
+    following = array("i")
+    for position in range(start, end):
+        index = frontier[position]
+        for offset in offsets:
+            neighbor = index + offset
+            if not cells[neighbor] and distances[neighbor] < 0:
+                distances[neighbor] = level
+                parents[neighbor] = index
+                following.append(neighbor)
+    return following.tobytes()
+
+def pack_bits(cells):
+    # Packs a byte-per-cell buffer into bits in BIT_CHUNK sized pieces.
+    packed = bytearray()
+    for start in range(0, len(cells), BIT_CHUNK):
+        chunk = bytes(cells[start:start + BIT_CHUNK])
+        digits = chunk.translate(BIT_TABLE)[::-1]
+        packed += int(digits, 2).to_bytes((len(chunk) + 7) // 8, "little")
+    return packed
+
+def unpack_bits(buffer, size):
+    cells = bytearray()
+    for start in range(0, size, BIT_CHUNK):
+        count = min(BIT_CHUNK, size - start)
+        chunk = bytes(buffer[start // 8:(start + count + 7) // 8])
+        digits = bin(int.from_bytes(chunk, "little"))[2:].zfill(len(chunk) * 8)
+        cells += digits[::-1][:count].encode().translate(UNBIT_TABLE)
+    return cells
+
+def grid_digest(grid):
+    # Hashes the bordered walls, unpacking bit grids first so that a maze
+    # has the same digest however it was loaded.
+    cells = grid.cells
+    if isinstance(cells, BitCells):
+        cells = unpack_bits(cells.buffer, len(cells))
+    digest = hashlib.sha256()
+    digest.update(struct.pack("<II", grid.width, grid.height))
+    digest.update(cells)
+    return digest.digest()
+
+def write_binary_maze(solver, filename):
+    grid = solver.grid
+    if isinstance(grid, BitGrid):
+        cells = unpack_bits(grid.cells.buffer, len(grid.cells))
+    else:
+        cells = grid.cells
+    with open(filename, "wb") as f:
+        f.write(BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, grid.width, grid.height,
+                                   *solver.start, *solver.goal))
+        f.write(pack_bits(cells))
+
+def write_text_maze(solver, filename):
+    with open(filename, "wb") as f:
+        for row in range(solver.height):
+            line = bytearray(bytes(solver.grid[row]).translate(TEXT_TABLE))
+            if solver.start[0] == row:
+                line[solver.start[1]] = ord("A")
+            if solver.goal[0] == row:
+                line[solver.goal[1]] = ord("B")
+            f.write(line + b"\n")
+
+def convert_maze(source, destination):
+    # The destination format follows its extension: ".maze" is binary,
+    # anything else is text.
+    solver = MazeSolver(source, packed=True)
+    if destination.endswith(".maze"):
+        write_binary_maze(solver, destination)
+    else:
+        write_text_maze(solver, destination)
+    return solver
 
 class MazeSolver:
-    def __init__(self, filename):
-        print(f"Attempting to load maze file: {filename}")
+    def __init__(self, filename, packed=False):
+        # With packed=True, self.maze is the PackedGrid itself instead of a
+        # list of lists; both support maze[r][c].
+        self.packed = packed
+        self.field_cache = OrderedDict()
+        self.field_cache_size = 4
+        self.field_cache_hits = 0
+        self.field_cache_misses = 0
+        # progress_callback(num_explored, frontier_size) is called periodically
+        # during a solve; cancel() makes the running solve raise SolveCancelled.
+        self.progress_callback = None
+        self.cancel_requested = False
+        self.planner = None
+        self.hierarchy = None
+        self.cluster_size = None
+        # Processes used by the parallel solver (None for one per core), and
+        # the smallest BFS level it hands to them.
+        self.workers = None
+        self.parallel_min_frontier = PARALLEL_MIN_FRONTIER
+        # Set solution_cache to a solution_cache.SolutionCache to reuse the
+        # results of earlier solves of the same walls, start and goal.
+        self.solution_cache = None
+        self.solution_cache_hits = 0
+        self.solution_cache_misses = 0
+        # Every solve() leaves a SolveStats in self.stats and passes it to each
+        # callable in stats_hooks. trace_memory adds peak_memory (through
+        # tracemalloc, which slows the search) and profile adds a sampled
+        # profile of the search.
+        self.stats = None
+        self.stats_hooks = []
+        self.trace_memory = False
+        self.profile = False
+        self.peak_frontier = None
+        logger.info("Attempting to load maze file: %s", filename)
         self.load_maze(filename)
-        print("Maze loaded successfully.")
+        logger.info("Maze loaded successfully.")
         self.solution = None
 
     def load_maze(self, filename):
         if not os.path.isfile(filename):
             raise FileNotFoundError(f"The file {filename} was not found.")
-        
-        with open(filename) as f:
-            contents = f.read()
 
-        if contents.count("A") != 1 or contents.count("B") != 1:
+        started = time.perf_counter()
+        with open(filename, "rb") as f:
+            binary = f.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+        if binary:
+            self.load_binary_maze(filename)
+        else:
+            self.load_text_maze(filename)
+        self.parse_time = time.perf_counter() - started
+        self.filename = filename
+        self.invalidate_caches()
+        self.planner = None
+        self.hierarchy = None
+
+        if self.packed:
+            self.maze = self.grid
+        else:
+            self.maze = [[bool(cell) for cell in row] for row in self.grid]
+
+    def load_text_maze(self, filename):
+        # Streams the file twice, once to size the grid and locate A and B and
+        # once to fill it, so only one line is held in memory at a time.
+        height = 0
+        width = 0
+        starts = 0
+        goals = 0
+        with open(filename, "rb") as f:
+            for i, line in enumerate(f):
+                line = line.rstrip(b"\r\n")
+                height += 1
+                width = max(width, len(line))
+                if b"A" in line:
+                    starts += line.count(b"A")
+                    self.start = (i, line.index(b"A"))
+                if b"B" in line:
+                    goals += line.count(b"B")
+                    self.goal = (i, line.index(b"B"))
+
+        if starts != 1 or goals != 1:
             raise Exception("The maze must contain one start point (A) and one goal point (B).")
 
-        contents = contents.splitlines()
-        self.height = len(contents)
-        self.width = max(len(line) for line in contents)
-        self.maze = []  # Initialize maze attribute
+        self.height = height
+        self.width = width
+        self.grid = PackedGrid(width, height)
+        with open(filename, "rb") as f:
+            for i, line in enumerate(f):
+                self.grid.set_row(i, line.rstrip(b"\r\n").translate(WALL_TABLE))
 
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                try:
-                    if contents[i][j] == "A":
-                        self.start = (i, j)
-                        row.append(False)
-                    elif contents[i][j] == "B":
-                        self.goal = (i, j)
-                        row.append(False)
-                    elif contents[i][j] == " ":
-                        row.append(False)
+    def load_binary_maze(self, filename):
+        with open(filename, "rb") as f:
+            self._mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mapping) < BINARY_HEADER.size:
+            raise Exception(f"The file {filename} is not a valid binary maze.")
+        magic, version, width, height, *points = BINARY_HEADER.unpack_from(self._mapping)
+        if version != BINARY_VERSION:
+            raise Exception(f"Unsupported binary maze version {version}.")
+
+        size = (width + 2) * (height + 2)
+        if len(self._mapping) < BINARY_HEADER.size + (size + 7) // 8:
+            raise Exception(f"The file {filename} is truncated.")
+
+        self.height = height
+        self.width = width
+        self.start = (points[0], points[1])
+        self.goal = (points[2], points[3])
+        self.grid = BitGrid(width, height, memoryview(self._mapping)[BINARY_HEADER.size:])
+        # Searches rely on the border to stay inside the grid, so a file
+        # whose border is not all walls is rejected.
+        stride = self.grid.stride
+        cells = self.grid.cells
+        if 0 in self.grid.span(0, stride) or 0 in self.grid.span((height + 1) * stride, stride) or \
+                not all(cells[row * stride] and cells[row * stride + stride - 1] for row in range(1, height + 1)):
+            raise Exception(f"The file {filename} is not a valid binary maze: its border must be all walls.")
+        for row, col in (self.start, self.goal):
+            if not (0 <= row < height and 0 <= col < width) or self.grid.is_wall(row, col):
+                raise Exception("The maze must contain one start point (A) and one goal point (B).")
+
+    def invalidate_caches(self):
+        # Must be called whenever the walls change.
+        self.field_cache.clear()
+        self.components = None
+        self.num_components = None
+        self.junctions = None
+        self.digest = None
+
+    def set_wall(self, row, col, blocked):
+        if not (0 <= row < self.height and 0 <= col < self.width):
+            raise IndexError(f"The cell {(row, col)} is outside the maze.")
+        if blocked and (row, col) in (self.start, self.goal):
+            raise Exception("The start and goal cells cannot be walls.")
+        if self.grid.is_wall(row, col) == bool(blocked):
+            return
+
+        if isinstance(self.grid, BitGrid):
+            # Memory-mapped mazes are read-only, so the first edit copies the
+            # walls into a PackedGrid.
+            self.grid = PackedGrid(self.width, self.height, unpack_bits(self.grid.cells.buffer, len(self.grid.cells)))
+            self.planner = None
+            if self.packed:
+                self.maze = self.grid
+            if self.hierarchy is not None:
+                self.hierarchy.grid = self.grid
+        self.grid.set_wall(row, col, blocked)
+        if not self.packed:
+            self.maze[row][col] = bool(blocked)
+        self.invalidate_caches()
+        if self.planner is not None:
+            self.planner.update_cell(self.grid.index(row, col))
+        if self.hierarchy is not None:
+            self.hierarchy.update_cell(self.grid.index(row, col))
+
+    def solve_with_lpastar(self):
+        # The first call searches from scratch; after set_wall() edits later
+        # calls only repair the previous search. num_reexpanded (also
+        # num_explored) counts the cells expanded by this call.
+        if self.planner is None or (self.planner.start, self.planner.goal) != (self.grid.index(*self.start), self.grid.index(*self.goal)):
+            self.planner = IncrementalPlanner(self.grid, self.start, self.goal)
+        self.num_reexpanded = self.planner.compute()
+        self.num_explored = self.num_reexpanded
+        self.peak_frontier = self.planner.peak_frontier
+        solution = self.planner.path()
+        if solution is None:
+            return None
+        self.solution = solution
+        return solution[1]
+
+    def distance_field(self, goal=None):
+        # Goal-rooted distance fields are kept in a small LRU cache so repeated
+        # queries towards the same goals skip the breadth-first search.
+        goal = self.goal if goal is None else goal
+        field = self.field_cache.get(goal)
+        if field is not None:
+            self.field_cache_hits += 1
+            self.field_cache.move_to_end(goal)
+            return field
+
+        row, col = goal
+        if not (0 <= row < self.height and 0 <= col < self.width) or self.grid.is_wall(row, col):
+            raise Exception(f"The goal {goal} is not an open cell of the maze.")
+        self.field_cache_misses += 1
+        field = DistanceField(self.grid, goal)
+        self.field_cache[goal] = field
+        while len(self.field_cache) > self.field_cache_size:
+            self.field_cache.popitem(last=False)
+        return field
+
+    def solve_from(self, start, goal=None):
+        # Shortest path from any cell to the goal in O(path length) once the
+        # goal's distance field is cached.
+        field = self.distance_field(goal)
+        row, col = start
+        if not (0 <= row < self.height and 0 <= col < self.width):
+            return None
+        index = self.grid.index(row, col)
+        if field.distances[index] < 0:
+            return None
+
+        self.solution = self.follow_successors(field.successors, index)
+        return self.solution[1]
+
+    def follow_successors(self, successors, index):
+        # Walks next-step links (an array or dict of grid indices ending in a
+        # self link at the goal) into an (actions, cells) solution.
+        return self.grid.path(self.grid.trace(successors, index))
+
+    def component_labels(self):
+        # Labels every open cell with its connected component (1, 2, ...),
+        # walls stay 0. Built once per maze with a scan-line flood fill that
+        # finds whole runs of open cells with bytes.find, and rebuilt lazily
+        # after the walls change.
+        if self.components is not None:
+            return self.components
+        grid = self.grid
+        cells = grid.cells if isinstance(grid.cells, bytearray) else unpack_bits(grid.cells.buffer, len(grid.cells))
+        stride = grid.stride
+        labels = array("i", [0]) * len(cells)
+        label = 0
+
+        position = cells.find(0)
+        while position >= 0:
+            end = cells.find(1, position)
+            if not labels[position]:
+                label += 1
+                fill = array("i", [label])
+                stack = [position]
+                while stack:
+                    seed = stack.pop()
+                    if labels[seed]:
+                        continue
+                    left = cells.rfind(1, 0, seed) + 1
+                    right = cells.find(1, seed)
+                    if right - left == 1:
+                        labels[left] = label
                     else:
-                        row.append(True)
-                except IndexError:
-                    row.append(False)
-            self.maze.append(row)
-        print(f"Maze loaded successfully: {self.maze}")
+                        labels[left:right] = fill * (right - left)
+                    # Seed every unlabeled run touching this one above and below.
+                    for offset in (-stride, stride):
+                        run = cells.find(0, left + offset, right + offset)
+                        while run >= 0:
+                            if not labels[run]:
+                                stack.append(run)
+                            run_end = cells.find(1, run, right + offset)
+                            if run_end < 0:
+                                break
+                            run = cells.find(0, run_end, right + offset)
+            position = cells.find(0, end)
+        self.components = labels
+        self.num_components = label
+        return labels
+
+    def reachable(self, first, second):
+        # O(1) once the component labels are built.
+        labels = self.component_labels()
+        for row, col in (first, second):
+            if not (0 <= row < self.height and 0 <= col < self.width):
+                return False
+        label = labels[self.grid.index(*first)]
+        return label != 0 and label == labels[self.grid.index(*second)]
+
+    def solve_many(self, pairs):
+        # Answers many (start, goal) queries. Unreachable pairs are rejected
+        # from the component labels without searching, and the rest are
+        # grouped by goal so each group costs one breadth-first search from
+        # its goal that stops once every start in the group is reached.
+        # Returns one (actions, cells) solution or None per pair.
+        results = [None] * len(pairs)
+        groups = {}
+        for position, (start, goal) in enumerate(pairs):
+            if self.reachable(start, goal):
+                groups.setdefault(goal, []).append(position)
+
+        for goal, positions in groups.items():
+            field = self.field_cache.get(goal)
+            if field is not None:
+                successors = field.successors
+            else:
+                targets = {self.grid.index(*pairs[position][0]) for position in positions}
+                successors = self.search_towards(goal, targets)
+            for position in positions:
+                results[position] = self.follow_successors(successors, self.grid.index(*pairs[position][0]))
+        return results
+
+    def search_towards(self, goal, targets):
+        # Breadth-first search from goal until every target index is reached;
+        # returns the next-step links as a dict.
+        cells = self.grid.cells
+        offsets = [offset for _, offset, _, _ in self.grid.offsets]
+        root = self.grid.index(*goal)
+        successors = {root: root}
+        remaining = set(targets)
+        remaining.discard(root)
+        queue = deque([root])
+        while queue and remaining:
+            index = queue.popleft()
+            for offset in offsets:
+                neighbor = index + offset
+                if not cells[neighbor] and neighbor not in successors:
+                    successors[neighbor] = index
+                    remaining.discard(neighbor)
+                    queue.append(neighbor)
+        return successors
+
+    def junction_graph(self):
+        # Built lazily and rebuilt after wall edits or a new start or goal.
+        graph = self.junctions
+        if graph is None or (graph.start, graph.goal) != (self.grid.index(*self.start), self.grid.index(*self.goal)):
+            graph = self.junctions = JunctionGraph(self.grid, self.start, self.goal)
+        return graph
+
+    def solve_with_junction_graph(self):
+        # num_explored counts the junction graph nodes expanded.
+        graph = self.junction_graph()
+        steps, self.num_explored = graph.search()
+        self.peak_frontier = graph.peak_frontier
+        if steps is None:
+            return None
+        self.solution = graph.expand(steps)
+        return self.solution[1]
+
+    def abstract_graph(self):
+        # The HPA* graph is read from next to the maze file when one was saved
+        # for these walls, otherwise built and saved there for later runs.
+        # Set cluster_size before the first hpa solve to override the default.
+        if self.hierarchy is None:
+            import hierarchical
+            cluster_size = self.cluster_size or hierarchical.DEFAULT_CLUSTER_SIZE
+            filename = hierarchical.graph_path(self.filename, cluster_size)
+            self.hierarchy = hierarchical.AbstractGraph.load(filename, self.grid, cluster_size)
+            if self.hierarchy is None:
+                self.hierarchy = hierarchical.AbstractGraph(self.grid, cluster_size)
+                try:
+                    self.hierarchy.save(filename)
+                except OSError:
+                    pass
+        return self.hierarchy
+
+    def solve_with_hpa(self):
+        # Near-optimal: paths follow cluster transitions, so they can be a
+        # little longer than BFS. num_explored counts abstract nodes.
+        graph = self.abstract_graph()
+        path, self.num_explored = graph.search(self.grid.index(*self.start), self.grid.index(*self.goal))
+        self.peak_frontier = graph.peak_frontier
+        if path is None:
+            return None
+        self.solution = graph.refine(path)
+        return self.solution[1]
 
     def neighbors(self, state):
         row, col = state
-        candidates = [
-            ("up", (row - 1, col)),
-            ("down", (row + 1, col)),
-            ("left", (row, col - 1)),
-            ("right", (row, col + 1))
-        ]
+        cells = self.grid.cells
+        index = (row + 1) * self.grid.stride + col + 1
         result = []
-        for action, (r, c) in candidates:
-            if 0 <= r < self.height and 0 <= c < self.width and not self.maze[r][c]:
-                result.append((action, (r, c)))
+        for action, offset, d_row, d_col in self.grid.offsets:
+            if not cells[index + offset]:
+                result.append((action, (row + d_row, col + d_col)))
         return result
 
-    def solve_with_dfs(self):
-        self.num_explored = 0  # Initialize the counter for explored nodes
-        start = Node(state=self.start, parent=None, action=None)
-        frontier = StackFrontier()
-        frontier.add(start)
-        self.explored = set()
+    def cancel(self):
+        self.cancel_requested = True
 
-        while True:
-            if frontier.empty():
+    def check_progress(self, frontier_size):
+        if self.cancel_requested:
+            self.cancel_requested = False
+            raise SolveCancelled("The search was cancelled.")
+        if self.progress_callback is not None:
+            self.progress_callback(self.num_explored, frontier_size)
+
+    def solve(self, algorithm, workers=None):
+        # workers overrides self.workers for this call; only the parallel
+        # solver uses processes.
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown search algorithm {algorithm!r}, expected one of {', '.join(ALGORITHMS)}.")
+        search = getattr(self, ALGORITHMS[algorithm])
+        if workers is not None:
+            if algorithm != "parallel":
+                raise ValueError(f"The {algorithm!r} search does not take workers.")
+            search = functools.partial(search, workers)
+        return self.instrumented_solve(algorithm, search)
+
+    def measure_solve(self, algorithm):
+        cells = self.solve(algorithm)
+        return cells, self.stats
+
+    def instrumented_solve(self, algorithm, search):
+        # Runs cached_solve(), then records self.stats and calls the hooks.
+        # Every solver sets peak_frontier; it stays None for cache hits.
+        self.peak_frontier = None
+        hits = self.solution_cache_hits
+        tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        elif self.trace_memory:
+            tracemalloc.reset_peak()
+        profiler = SamplingProfiler() if self.profile else None
+        if profiler is not None:
+            profiler.start()
+        started = time.perf_counter()
+        try:
+            cells = self.cached_solve(algorithm, search)
+        finally:
+            search_time = time.perf_counter() - started
+            if profiler is not None:
+                profiler.stop()
+            peak_memory = tracemalloc.get_traced_memory()[1] if self.trace_memory else None
+            if tracing:
+                tracemalloc.stop()
+
+        self.stats = SolveStats(
+            algorithm, self.parse_time, search_time, self.num_explored, self.peak_frontier,
+            peak_memory=peak_memory,
+            path_length=len(cells) if cells is not None else None,
+            cached=self.solution_cache_hits > hits,
+            profile=profiler.top() if profiler is not None else None
+        )
+        for hook in self.stats_hooks:
+            hook(self.stats)
+        return cells
+
+    def maze_digest(self):
+        if self.digest is None:
+            self.digest = grid_digest(self.grid)
+        return self.digest
+
+    def cached_solve(self, algorithm, search):
+        # Runs search() unless the solution cache already holds the result,
+        # in which case the cached path and num_explored are restored.
+        if self.solution_cache is None:
+            return search()
+        key = self.solution_cache.key(self.maze_digest(), algorithm, self.start, self.goal, self.cache_options(algorithm))
+        entry = self.solution_cache.get(key)
+        if entry is not None:
+            self.solution_cache_hits += 1
+            actions, self.num_explored = entry
+            if actions is None:
+                self.solution = None
                 return None
+            self.solution = self.replay(actions)
+            return self.solution[1]
 
-            node = frontier.remove()
-            self.num_explored += 1  # Increment the explored count for each node
+        self.solution_cache_misses += 1
+        cells = search()
+        self.solution_cache.put(key, self.solution[0] if cells is not None else None, self.num_explored)
+        return cells
 
-            if node.state == self.goal:
-                actions = []
-                cells = []
-                while node.parent is not None:
-                    actions.append(node.action)
-                    cells.append(node.state)
-                    node = node.parent
-                actions.reverse()
-                cells.reverse()
-                self.solution = (actions, cells)
-                return cells
+    def cache_options(self, algorithm):
+        # Solver settings besides the walls, start and goal that can change
+        # an algorithm's answer, as part of its solution cache key.
+        if algorithm == "hpa":
+            import hierarchical
+            return f"cluster_size={self.cluster_size or hierarchical.DEFAULT_CLUSTER_SIZE}"
+        return ""
 
-            self.explored.add(node.state)
+    def replay(self, actions):
+        # Rebuilds (actions, cells) by following actions from the start.
+        deltas = {action: (d_row, d_col) for action, _, d_row, d_col in self.grid.offsets}
+        row, col = self.start
+        cells = []
+        for action in actions:
+            d_row, d_col = deltas[action]
+            row, col = row + d_row, col + d_col
+            cells.append((row, col))
+        return (actions, cells)
 
-            for action, state in self.neighbors(node.state):
-                if not frontier.contains_state(state) and state not in self.explored:
-                    child = Node(state=state, parent=node, action=action)
-                    frontier.add(child)
+    def stepper(self, algorithm):
+        return SearchStepper(self, algorithm)
+
+    def run_stepper(self, algorithm):
+        stepper = self.stepper(algorithm)
+        stepper.reporting = True
+        self.num_explored = 0
+        stepper.advance()
+        self.num_explored = stepper.num_explored
+        self.peak_frontier = stepper.peak_frontier
+        if stepper.solution is None:
+            return None
+        self.solution = stepper.solution
+        return stepper.solution[1]
+
+    def solve_with_dfs(self):
+        return self.run_stepper("dfs")
 
     def solve_with_bfs(self):
-        self.num_explored = 0  # Initialize the counter for explored nodes
-        start = Node(state=self.start, parent=None, action=None)
-        frontier = QueueFrontier()
-        frontier.add(start)
-        self.explored = set()
+        return self.run_stepper("bfs")
+
+    def solve_with_astar(self):
+        return self.run_stepper("astar")
+
+    def solve_with_greedy(self):
+        return self.run_stepper("greedy")
+
+    def solve_with_bidirectional_bfs(self):
+        # Breadth-first searches from both ends, always expanding a whole level
+        # of the smaller frontier. Forward entries map a state to its parent,
+        # backward entries map a state to its next step towards the goal.
+        self.num_explored = 0
+        forward = {self.start: (None, None, 0)}
+        backward = {self.goal: (None, None, 0)}
+        forward_frontier = [self.start]
+        backward_frontier = [self.goal]
+        self.peak_frontier = 2
+
+        while forward_frontier and backward_frontier:
+            if len(forward_frontier) <= len(backward_frontier):
+                expanded = len(forward_frontier)
+                forward_frontier, meeting = self.expand_level(forward_frontier, forward, backward, False)
+            else:
+                expanded = len(backward_frontier)
+                backward_frontier, meeting = self.expand_level(backward_frontier, backward, forward, True)
+            # The expanded level is held until the next one is complete.
+            self.peak_frontier = max(self.peak_frontier, expanded + len(forward_frontier) + len(backward_frontier))
+            if meeting is not None:
+                return self.join_paths(forward, backward, meeting)
+        return None
+
+    def expand_level(self, frontier, parents, others, backward):
+        # Returns the next level and the first meeting found on this level as
+        # (forward state, backward state, action between them), stopping as
+        # soon as there is one. That meeting is already the shortest: a
+        # neighbor the other side had expanded, rather than only reached,
+        # would have met this side one level earlier, so every meeting on
+        # the first level that has any goes through the other side's
+        # frontier and has the same length.
+        next_frontier = []
+        for state in frontier:
+            self.num_explored += 1
+            if self.num_explored % PROGRESS_INTERVAL == 0:
+                self.check_progress(len(frontier) + len(next_frontier))
+            depth = parents[state][2] + 1
+            for action, neighbor in self.neighbors(state):
+                if backward:
+                    action = OPPOSITE_ACTIONS[action]
+                if neighbor in others:
+                    return next_frontier, (neighbor, state, action) if backward else (state, neighbor, action)
+                if neighbor not in parents:
+                    parents[neighbor] = (state, action, depth)
+                    next_frontier.append(neighbor)
+        return next_frontier, None
+
+    def join_paths(self, forward, backward, meeting):
+        forward_state, backward_state, action = meeting
+        actions = []
+        cells = []
+        state = forward_state
+        while forward[state][0] is not None:
+            parent, step, _ = forward[state]
+            actions.append(step)
+            cells.append(state)
+            state = parent
+        actions.reverse()
+        cells.reverse()
 
+        actions.append(action)
+        cells.append(backward_state)
+        state = backward_state
+        while backward[state][0] is not None:
+            following, step, _ = backward[state]
+            actions.append(step)
+            cells.append(following)
+            state = following
+        self.solution = (actions, cells)
+        return cells
+
+    def solve_with_jps(self):
+        # Jump Point Search adapted to 4-connected grids: A* over jump points,
+        # where straight runs of cells are skipped by jump() instead of being
+        # pushed through the frontier one at a time. num_explored counts the
+        # expanded jump points and num_touched every cell scanned while jumping.
+        self.num_explored = 0
+        self.num_touched = 0
+        grid = self.grid
+        start = grid.index(*self.start)
+        goal = grid.index(*self.goal)
+        parents = {start: None}
+        costs = {start: 0}
+        closed = set()
+        frontier = []
+        count = 0
+        heapq.heappush(frontier, (grid.distance(start, goal), 0, count, start))
+        self.peak_frontier = 1
+
+        while frontier:
+            _, _, _, index = heapq.heappop(frontier)
+            if index in closed:
+                continue
+            closed.add(index)
+            self.num_explored += 1
+            if self.num_explored % PROGRESS_INTERVAL == 0:
+                self.check_progress(len(frontier))
+
+            if index == goal:
+                self.num_jump_points = len(parents)
+                return self.record_jump_path(parents, goal)
+
+            cost = costs[index]
+            for neighbor in self.jump_successors(index, parents[index]):
+                point = self.jump(neighbor, neighbor - index)
+                if point is None or point in closed:
+                    continue
+                point_cost = cost + grid.distance(index, point)
+                if point in costs and costs[point] <= point_cost:
+                    continue
+                costs[point] = point_cost
+                parents[point] = index
+                count += 1
+                heapq.heappush(frontier, (point_cost + grid.distance(point, goal), -point_cost, count, point))
+            if len(frontier) > self.peak_frontier:
+                self.peak_frontier = len(frontier)
+
+        self.num_jump_points = len(parents)
+        return None
+
+    def jump_successors(self, index, parent):
+        # Neighbors worth jumping towards: every open neighbor at the start,
+        # otherwise straight ahead plus both sides of the direction of travel.
+        cells = self.grid.cells
+        stride = self.grid.stride
+        if parent is None:
+            candidates = [index + offset for _, offset, _, _ in self.grid.offsets]
+        else:
+            step = self.jump_step(index - parent)
+            side = stride if step in (1, -1) else 1
+            candidates = [index - side, index + side, index + step]
+        return [candidate for candidate in candidates if not cells[candidate]]
+
+    def jump_step(self, delta):
+        stride = self.grid.stride
+        if -stride < delta < stride:
+            return 1 if delta > 0 else -1
+        return stride if delta > 0 else -stride
+
+    def jump(self, index, step):
+        # Walks from index in direction step and returns the first jump point:
+        # the goal, a cell with a forced neighbor, or (when moving vertically)
+        # a cell from which a horizontal jump finds one.
+        cells = self.grid.cells
+        goal = self.grid.index(*self.goal)
+        horizontal = step in (1, -1)
+        side = self.grid.stride if horizontal else 1
         while True:
-            if frontier.empty():
+            if cells[index]:
+                return None
+            self.num_touched += 1
+            if index == goal:
+                return index
+            if (not cells[index - side] and cells[index - side - step]) or \
+                    (not cells[index + side] and cells[index + side - step]):
+                return index
+            if not horizontal:
+                if self.jump(index + 1, 1) is not None or self.jump(index - 1, -1) is not None:
+                    return index
+            index += step
+
+    def numpy_distance_map(self, source=None, stop=None):
+        # Breadth-first distances from source, expanding a whole wavefront per
+        # NumPy operation: the frontier is an array of flat cell indices, its
+        # neighbors are found by adding the four offsets and filtered with the
+        # open and unvisited masks. The search stops early once stop is
+        # reached. Returns the bordered int32 map, -1 where unreached.
+        numpy = import_numpy()
+        source = self.start if source is None else source
+        open_cells = (self.grid.to_numpy() == 0).ravel()
+        distances = numpy.full(open_cells.shape, -1, dtype=numpy.int32)
+        offsets = numpy.array([offset for _, offset, _, _ in self.grid.offsets])
+        stop = None if stop is None else self.grid.index(*stop)
+        frontier = numpy.array([self.grid.index(*source)])
+        distances[frontier] = 0
+        level = 0
+        self.peak_frontier = 1
+
+        while stop is None or distances[stop] < 0:
+            reached = (frontier[:, None] + offsets).ravel()
+            reached = reached[open_cells[reached] & (distances[reached] < 0)]
+            if len(reached) == 0:
+                break
+            level += 1
+            frontier = numpy.unique(reached)
+            distances[frontier] = level
+            self.peak_frontier = max(self.peak_frontier, len(frontier))
+        return distances.reshape(self.height + 2, self.grid.stride)
+
+    def solve_with_numpy_bfs(self):
+        # Vectorised BFS for dense open mazes. The path is recovered by
+        # descending the distance map from the goal, and num_explored counts
+        # the cells the wavefront reached.
+        distances = self.numpy_distance_map(self.start, self.goal)
+        self.num_explored = int((distances >= 0).sum())
+        flat = distances.ravel()
+        index = self.grid.index(*self.goal)
+        if flat[index] < 0:
+            return None
+
+        offsets = [offset for _, offset, _, _ in self.grid.offsets]
+        indices = [index]
+        while flat[index] > 0:
+            for offset in offsets:
+                if flat[index + offset] == flat[index] - 1:
+                    index += offset
+                    break
+            indices.append(index)
+        indices.reverse()
+        self.solution = self.grid.path(indices)
+        return self.solution[1]
+
+    def solve_with_parallel_bfs(self, workers=None):
+        # Level-synchronous BFS. The walls, distances, parents and current
+        # frontier live in shared memory. Levels of at least
+        # parallel_min_frontier cells are split across a process pool whose
+        # workers claim cells in the shared arrays themselves, so the parent
+        # only joins their slices of the next level; smaller levels are
+        # expanded in the parent. Paths are as short as solve_with_bfs()'s and
+        # num_explored counts the cells expanded.
+        # Imported here so that loading this module stays cheap.
+        from multiprocessing import Pool, shared_memory
+        workers = workers or self.workers or os.cpu_count() or 1
+        grid = self.grid
+        size = len(grid.cells)
+        cells = grid.cells if isinstance(grid.cells, bytearray) else unpack_bits(grid.cells.buffer, size)
+        offsets = tuple(offset for _, offset, _, _ in grid.offsets)
+        start = grid.index(*self.start)
+        goal = grid.index(*self.goal)
+
+        blocks = [shared_memory.SharedMemory(create=True, size=size)]
+        blocks += [shared_memory.SharedMemory(create=True, size=size * 4) for _ in range(3)]
+        views = []
+        pool = None
+        try:
+            blocks[0].buf[:size] = cells
+            views = [block.buf.cast("i") for block in blocks[1:]]
+            distances, parents, shared_frontier = views
+            distances[:size] = array("i", [-1]) * size
+            parents[:size] = array("i", [-1]) * size
+            if workers > 1:
+                pool = Pool(workers, attach_parallel_search, ([block.name for block in blocks], offsets))
+
+            distances[start] = 0
+            parents[start] = start
+            frontier = array("i", [start])
+            level = 0
+            self.num_explored = 0
+            self.peak_frontier = 1
+            while frontier and distances[goal] < 0:
+                self.num_explored += len(frontier)
+                self.peak_frontier = max(self.peak_frontier, len(frontier))
+                self.check_progress(len(frontier))
+                level += 1
+                following = array("i")
+                if pool is None or len(frontier) < self.parallel_min_frontier:
+                    for index in frontier:
+                        for offset in offsets:
+                            neighbor = index + offset
+                            if not cells[neighbor] and distances[neighbor] < 0:
+                                distances[neighbor] = level
+                                parents[neighbor] = index
+                                following.append(neighbor)
+                else:
+                    shared_frontier[:len(frontier)] = frontier
+                    chunk = -(-len(frontier) // workers)
+                    ranges = [(first, min(first + chunk, len(frontier)), level) for first in range(0, len(frontier), chunk)]
+                    for result in pool.starmap(expand_parallel_chunk, ranges):
+                        following.frombytes(result)
+                frontier = following
+
+            if distances[goal] < 0:
                 return None
+            self.solution = grid.path(grid.trace(parents, goal)[::-1])
+            return self.solution[1]
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+            for view in views:
+                view.release()
+            for block in blocks:
+                block.close()
+                block.unlink()
 
-            node = frontier.remove()
-            self.num_explored += 1  # Increment the explored count for each node
-
-            if node.state == self.goal:
-                actions = []
-                cells = []
-                while node.parent is not None:
-                    actions.append(node.action)
-                    cells.append(node.state)
-                    node = node.parent
-                actions.reverse()
-                cells.reverse()
-                self.solution = (actions, cells)
-                return cells
-
-            self.explored.add(node.state)
-
-            for action, state in self.neighbors(node.state):
-                if not frontier.contains_state(state) and state not in self.explored:
-                    child = Node(state=state, parent=node, action=action)
-                    frontier.add(child)
+    def record_jump_path(self, parents, goal):
+        # Expands consecutive jump points back into the straight runs of cells
+        # between them.
+        index = goal
+        indices = [index]
+        while parents[index] is not None:
+            parent = parents[index]
+            step = self.jump_step(index - parent)
+            while index != parent:
+                index -= step
+                indices.append(index)
+        indices.reverse()
+        self.solution = self.grid.path(indices)
+        return self.solution[1]
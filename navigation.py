@@ -0,0 +1,27 @@
+# One long-lived instance of each top-level window. Windows are created (and
+# their modules imported) the first time they are shown, and navigating away
+# only hides them, so a window comes back exactly as it was left.
+WINDOWS = {}
+
+def welcome_window():
+    if "welcome" not in WINDOWS:
+        from welcome import WelcomeWindow
+        WINDOWS["welcome"] = WelcomeWindow()
+    return WINDOWS["welcome"]
+
+def main_window():
+    if "main" not in WINDOWS:
+        from ui_main import MainWindow
+        WINDOWS["main"] = MainWindow()
+    return WINDOWS["main"]
+
+def show(window):
+    window.showFullScreen()
+    window.raise_()
+    window.activateWindow()
+
+def show_welcome():
+    show(welcome_window())
+
+def show_main():
+    show(main_window())
@@ -0,0 +1,167 @@
+import hashlib
+import os
+import struct
+import sys
+import tempfile
+
+CACHE_MAGIC = b"MSOL"
+CACHE_VERSION = 1
+# magic, version, num_explored, path length (-1 when the maze has no solution)
+CACHE_HEADER = struct.Struct("<4sHxxIi")
+CACHE_SUFFIX = ".sol"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 50000
+# Eviction trims the directory down to this fraction of both limits, and the
+# directory is rescanned at least every EVICT_EVERY writes to account for
+# other processes writing to it.
+LOW_WATER = 0.75
+EVICT_EVERY = 1024
+# Moves are stored two bits each, in this order.
+MOVES = ("up", "down", "left", "right")
+
+def default_cache_directory():
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "maze_solver", "solutions")
+
+def pack_moves(actions):
+    codes = [MOVES.index(action) for action in actions]
+    packed = bytearray((len(codes) + 3) // 4)
+    for position, code in enumerate(codes):
+        packed[position >> 2] |= code << ((position & 3) * 2)
+    return packed
+
+def unpack_moves(packed, length):
+    return [MOVES[(packed[position >> 2] >> ((position & 3) * 2)) & 3] for position in range(length)]
+
+def disk_usage(stat):
+    # Small entries still occupy whole filesystem blocks; st_blocks is not
+    # available on Windows, where the file size is used instead.
+    blocks = getattr(stat, "st_blocks", None)
+    return blocks * 512 if blocks is not None else stat.st_size
+
+class SolutionCache:
+    # Solved paths stored one file per key in a directory, content addressed
+    # by the maze walls, algorithm and start and goal. Entries are written to
+    # a temporary file and renamed into place, so several processes can share
+    # one directory; reads touch the file's mtime, and the least recently used
+    # entries are deleted once the directory holds more than max_bytes of disk
+    # blocks or more than max_entries files. options carries any solver
+    # setting that changes the answer, such as the HPA* cluster size.
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES, max_entries=DEFAULT_MAX_ENTRIES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        # Running totals of this directory, refreshed by every scan and
+        # advanced by this process's own writes in between.
+        self.total_bytes = None
+        self.num_entries = None
+        self.puts_since_scan = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, digest, algorithm, start, goal, options=""):
+        key = hashlib.sha256(digest)
+        key.update(f"{algorithm}:{start[0]},{start[1]}:{goal[0]},{goal[1]}:{options}".encode())
+        return key.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + CACHE_SUFFIX)
+
+    def get(self, key):
+        # Returns (actions, num_explored), with actions None for a maze that
+        # has no solution, or None when the key is not cached.
+        path = self.path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        if len(data) < CACHE_HEADER.size:
+            return None
+        magic, version, num_explored, length = CACHE_HEADER.unpack_from(data)
+        if (magic, version) != (CACHE_MAGIC, CACHE_VERSION):
+            return None
+        if length < 0:
+            return (None, num_explored)
+        packed = data[CACHE_HEADER.size:]
+        if len(packed) != (length + 3) // 4:
+            return None
+        return (unpack_moves(packed, length), num_explored)
+
+    def put(self, key, actions, num_explored):
+        length = -1 if actions is None else len(actions)
+        data = CACHE_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, num_explored, length)
+        if actions is not None:
+            data += pack_moves(actions)
+
+        descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as f:
+                f.write(data)
+            os.replace(temporary, self.path(key))
+        except BaseException:
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
+            raise
+
+        # Scanning costs O(entries), so it only happens when the running
+        # totals cross a limit or after EVICT_EVERY writes.
+        self.puts_since_scan += 1
+        if self.total_bytes is None or self.puts_since_scan >= EVICT_EVERY:
+            self.evict()
+            return
+        try:
+            self.total_bytes += disk_usage(os.stat(self.path(key)))
+        except OSError:
+            pass
+        self.num_entries += 1
+        if self.total_bytes > self.max_bytes or self.num_entries > self.max_entries:
+            self.evict()
+
+    def evict(self):
+        # Deletes least recently used entries until the directory is below
+        # LOW_WATER of both limits, so the next scan is many writes away.
+        entries = []
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if not entry.name.endswith(CACHE_SUFFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, disk_usage(stat), entry.path))
+        total = sum(usage for _, usage, _ in entries)
+        count = len(entries)
+        if total > self.max_bytes or count > self.max_entries:
+            target_bytes = self.max_bytes * LOW_WATER
+            target_entries = self.max_entries * LOW_WATER
+            # Another process may be evicting at the same time, so entries
+            # that are already gone are simply skipped.
+            entries.sort()
+            for _, usage, path in entries:
+                if total <= target_bytes and count <= target_entries:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                total -= usage
+                count -= 1
+        self.total_bytes = total
+        self.num_entries = count
+        self.puts_since_scan = 0
+
+    def clear(self):
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if entry.name.endswith(CACHE_SUFFIX):
+                    try:
+                        os.remove(entry.path)
+                    except OSError:
+                        pass
@@ -1,8 +1,84 @@
 from PyQt5.QtWidgets import QApplication, QMainWindow, QGraphicsView, QGraphicsScene, QVBoxLayout, QHBoxLayout, QWidget, QPushButton, QLabel, QSizePolicy, QRadioButton, QGroupBox, QFormLayout, QSpacerItem, QFileDialog
-from PyQt5.QtGui import QColor
-from PyQt5.QtCore import Qt
-from maze_solver import MazeSolver
+from PyQt5.QtGui import QColor, QImage, QPainterPath, QPen, QPixmap
+from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from maze_solver import STEPPABLE_ALGORITHMS, MazeSolver, SolveCancelled
+from solution_cache import SolutionCache, default_cache_directory
 import sys
+import time
+
+# Minimum seconds between two progress updates sent to the GUI thread.
+PROGRESS_PERIOD = 0.25
+
+# Palette indices of the maze image: open cells, walls, start and goal.
+MAZE_COLORS = [QColor("white").rgb(), QColor("black").rgb(), QColor("red").rgb(), QColor("green").rgb()]
+# Palette of the exploration overlay: transparent, then explored cells.
+EXPLORED_COLORS = [QColor(0, 0, 0, 0).rgba(), QColor(120, 170, 255, 160).rgba()]
+
+class SolveWorker(QThread):
+    # Runs one solve off the GUI thread and reports back through signals.
+    # Steppable searches run in short time slices and mark the cells they
+    # explore in overlay, one byte per cell of the bordered grid; explored
+    # hands that buffer to the GUI along with the progress.
+    progress = pyqtSignal(int, int)
+    explored = pyqtSignal(object)
+    solved = pyqtSignal(object)
+    cancelled = pyqtSignal()
+    failed = pyqtSignal(str)
+
+    def __init__(self, solver, algorithm, parent=None):
+        super().__init__(parent)
+        self.solver = solver
+        self.algorithm = algorithm
+        self.last_progress = 0.0
+        self.overlay = None
+        self.dirty = False
+
+    def report_progress(self, num_explored, frontier_size):
+        now = time.monotonic()
+        if now - self.last_progress >= PROGRESS_PERIOD:
+            self.last_progress = now
+            if self.dirty:
+                self.dirty = False
+                self.explored.emit(self.overlay)
+            self.progress.emit(num_explored, frontier_size)
+
+    def run(self):
+        self.solver.cancel_requested = False
+        self.solver.progress_callback = self.report_progress
+        try:
+            if self.algorithm in STEPPABLE_ALGORITHMS:
+                self.solved.emit(self.solver.instrumented_solve(self.algorithm, self.run_stepper))
+            else:
+                self.solved.emit(self.solver.solve(self.algorithm))
+        except SolveCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(str(e))
+        finally:
+            self.solver.progress_callback = None
+
+    def run_stepper(self):
+        stepper = self.solver.stepper(self.algorithm)
+        self.overlay = overlay = bytearray(len(self.solver.grid.cells))
+        while not stepper.done:
+            for index in stepper.advance(time_budget=PROGRESS_PERIOD / 5, collect=True):
+                overlay[index] = 1
+            self.dirty = True
+            # Raises SolveCancelled after cancel() and calls report_progress().
+            self.solver.num_explored = stepper.num_explored
+            self.solver.check_progress(stepper.frontier_size())
+        if self.dirty:
+            self.dirty = False
+            self.explored.emit(overlay)
+        self.solver.num_explored = stepper.num_explored
+        self.solver.peak_frontier = stepper.peak_frontier
+        if stepper.solution is None:
+            return None
+        self.solver.solution = stepper.solution
+        return stepper.solution[1]
+
+    def cancel(self):
+        self.solver.cancel()
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -54,6 +130,18 @@ class MainWindow(QMainWindow):
         """)
         button_layout.addWidget(self.reset_button)
 
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setStyleSheet("""
+            font-size: 40px;
+            padding: 25px;
+            background-color: #D9D9D9;
+            color: black;
+            border: none;
+            border-radius: 15px;
+        """)
+        self.cancel_button.setEnabled(False)
+        button_layout.addWidget(self.cancel_button)
+
         layout.addLayout(button_layout)
 
         self.info_label = QLabel("Information:")
@@ -79,11 +167,25 @@ class MainWindow(QMainWindow):
             padding: 10px;
             color: white;
         """)
+        self.astar_radio = QRadioButton("A* Search: Expands the node with the lowest cost plus distance to the goal.")
+        self.astar_radio.setStyleSheet("""
+            font-size: 20px;
+            padding: 10px;
+            color: white;
+        """)
+        self.greedy_radio = QRadioButton("Greedy Best-First-Search: Expands the node closest to the goal.")
+        self.greedy_radio.setStyleSheet("""
+            font-size: 20px;
+            padding: 10px;
+            color: white;
+        """)
 
         self.dfs_radio.setChecked(True)
 
         self.radio_layout.addWidget(self.dfs_radio)
         self.radio_layout.addWidget(self.bfs_radio)
+        self.radio_layout.addWidget(self.astar_radio)
+        self.radio_layout.addWidget(self.greedy_radio)
         self.radio_group.setLayout(self.radio_layout)
 
         layout.addWidget(self.radio_group)
@@ -111,17 +213,31 @@ class MainWindow(QMainWindow):
         self.load_button.clicked.connect(self.load_maze)
         self.solve_button.clicked.connect(self.solve_maze)
         self.reset_button.clicked.connect(self.reset_maze)
+        self.cancel_button.clicked.connect(self.cancel_solve)
 
         self.solver = None
+        self.solution_item = None
+        self.explored_item = None
+        self.render_time = 0.0
+        self.worker = None
+        self.search_method = None
+        # Reopened mazes are answered from disk instead of searched again.
+        try:
+            self.solution_cache = SolutionCache(default_cache_directory())
+        except OSError:
+            self.solution_cache = None
 
         self.dfs_radio.toggled.connect(self.update_method_info)
         self.bfs_radio.toggled.connect(self.update_method_info)
+        self.astar_radio.toggled.connect(self.update_method_info)
+        self.greedy_radio.toggled.connect(self.update_method_info)
 
     def load_maze(self):
-        filename, _ = QFileDialog.getOpenFileName(self, "Open Maze File", "", "Text Files (*.txt)")
+        filename, _ = QFileDialog.getOpenFileName(self, "Open Maze File", "", "Maze Files (*.txt *.maze)")
         if filename:
             try:
-                self.solver = MazeSolver(filename)
+                self.solver = MazeSolver(filename, packed=True)
+                self.solver.solution_cache = self.solution_cache
                 self.info_label.setText("Maze loaded.")
                 self.draw_maze()
                 self.update_method_info()  
@@ -129,81 +245,200 @@ class MainWindow(QMainWindow):
                 self.info_label.setText(f"Error: {str(e)}")
 
     def solve_maze(self):
+        if self.worker is not None:
+            return
         if self.solver is not None:
-            search_method = "DFS" if self.dfs_radio.isChecked() else "BFS"
-            solution = self.solver.solve_with_dfs() if search_method == "DFS" else self.solver.solve_with_bfs()
-            if solution:
-                self.info_label.setText(f"Solution found with {len(solution)} steps (method: {search_method}, {self.solver.num_explored} nodes explored).")
-                self.draw_solution(solution)
-            else:
-                self.info_label.setText("No solution found.")
+            self.search_method, algorithm = self.selected_method()
+            self.clear_solution()
+            self.worker = SolveWorker(self.solver, algorithm, self)
+            self.worker.progress.connect(self.show_progress)
+            self.worker.explored.connect(self.draw_explored)
+            self.worker.solved.connect(self.show_solution)
+            self.worker.cancelled.connect(self.show_cancelled)
+            self.worker.failed.connect(self.show_error)
+            self.worker.finished.connect(self.solve_finished)
+            self.set_solving(True)
+            self.info_label.setText(f"Solving (method: {self.search_method})...")
+            self.worker.start()
         else:
             self.info_label.setText("Please load a maze first.")
 
+    def cancel_solve(self):
+        if self.worker is not None:
+            self.worker.cancel()
+
+    def set_solving(self, solving):
+        self.load_button.setEnabled(not solving)
+        self.solve_button.setEnabled(not solving)
+        self.reset_button.setEnabled(not solving)
+        self.radio_group.setEnabled(not solving)
+        self.cancel_button.setEnabled(solving)
+
+    def show_progress(self, num_explored, frontier_size):
+        self.info_label.setText(f"Solving (method: {self.search_method}): {num_explored} nodes explored, frontier {frontier_size}.")
+
+    def show_solution(self, solution):
+        stats = self.solver.stats
+        timing = f"parse {stats.parse_time * 1000:.1f} ms, search {stats.search_time * 1000:.1f} ms"
+        if stats.cached:
+            timing += ", cached"
+        if solution:
+            self.info_label.setText(f"Solution found with {len(solution)} steps (method: {self.search_method}, {self.solver.num_explored} nodes explored, {timing}).")
+            self.draw_solution(solution)
+        else:
+            self.info_label.setText(f"No solution found ({timing}).")
+
+    def show_cancelled(self):
+        self.info_label.setText(f"Search cancelled (method: {self.search_method}).")
+
+    def show_error(self, message):
+        self.info_label.setText(f"Error: {message}")
+
+    def solve_finished(self):
+        self.worker.deleteLater()
+        self.worker = None
+        self.set_solving(False)
+
+    def selected_method(self):
+        if self.bfs_radio.isChecked():
+            return "BFS", "bfs"
+        if self.astar_radio.isChecked():
+            return "A*", "astar"
+        if self.greedy_radio.isChecked():
+            return "Greedy", "greedy"
+        return "DFS", "dfs"
+
     def reset_maze(self):
         if self.solver:
-            self.draw_maze()
+            self.clear_solution()
             self.info_label.setText("Maze reset.")
 
+    def cell_size(self):
+        view_width = self.view.size().width()
+        view_height = self.view.size().height()
+        cell_size = min(view_width / self.solver.width, view_height / self.solver.height)
+        # Whole pixels per cell keep walls crisp; mazes larger than the view
+        # are shrunk instead of collapsing to a zero cell size.
+        return int(cell_size) if cell_size >= 1 else cell_size
+
     def draw_maze(self):
+        # The whole grid is one indexed QImage filled straight from the packed
+        # maze buffer and shown as a single pixmap item.
         scene = self.view.scene()
         scene.clear()
+        self.solution_item = None
+        self.explored_item = None
 
         if self.solver is None:
             return
 
-        maze_width = self.solver.width
-        maze_height = self.solver.height
-        view_width = self.view.size().width()
-        view_height = self.view.size().height()
-
-        cell_size = min(view_width // maze_width, view_height // maze_height)
-
-        for row, line in enumerate(self.solver.maze):
-            for col, cell in enumerate(line):
-                color = QColor("black") if cell else QColor("white")
-                rect = scene.addRect(col * cell_size, row * cell_size, cell_size, cell_size)
-                rect.setBrush(color)
+        started = time.perf_counter()
+        grid = self.solver.grid
+        cell_size = self.cell_size()
+        bytes_per_line = (grid.width + 3) & ~3
+        pixels = grid.pixels(bytes_per_line)
+        pixels[self.solver.start[0] * bytes_per_line + self.solver.start[1]] = 2
+        pixels[self.solver.goal[0] * bytes_per_line + self.solver.goal[1]] = 3
+
+        image = QImage(bytes(pixels), grid.width, grid.height, bytes_per_line, QImage.Format_Indexed8)
+        image.setColorTable(MAZE_COLORS)
+        if cell_size < 1:
+            image = image.scaled(max(1, round(grid.width * cell_size)), max(1, round(grid.height * cell_size)),
+                                 Qt.IgnoreAspectRatio, Qt.FastTransformation)
+        else:
+            image = image.copy()
+        pixmap_item = scene.addPixmap(QPixmap.fromImage(image))
+        pixmap_item.setTransformationMode(Qt.FastTransformation)
+        pixmap_item.setScale(cell_size * grid.width / image.width())
 
         start_x = self.solver.start[1] * cell_size
         start_y = self.solver.start[0] * cell_size
-        scene.addRect(start_x, start_y, cell_size, cell_size).setBrush(QColor("red"))
         scene.addText("A").setPos(start_x + (cell_size // 4), start_y + (cell_size // 4))
 
         goal_x = self.solver.goal[1] * cell_size
         goal_y = self.solver.goal[0] * cell_size
-        scene.addRect(goal_x, goal_y, cell_size, cell_size).setBrush(QColor("green"))
         scene.addText("B").setPos(goal_x + (cell_size // 4), goal_y + (cell_size // 4))
+        self.render_time = time.perf_counter() - started
 
     def draw_solution(self, solution):
+        # The path is a single QPainterPath overlay through the cell centers,
+        # drawn in cell units and scaled like the maze image.
         scene = self.view.scene()
 
         if self.solver is None:
             return
 
-        maze_width = self.solver.width
-        maze_height = self.solver.height
-        view_width = self.view.size().width()
-        view_height = self.view.size().height()
-
-        cell_size = min(view_width // maze_width, view_height // maze_height)
-
+        started = time.perf_counter()
+        if self.solution_item is not None:
+            scene.removeItem(self.solution_item)
+        path = QPainterPath()
+        path.moveTo(self.solver.start[1] + 0.5, self.solver.start[0] + 0.5)
         for pos in solution:
-            scene.addRect(pos[1] * cell_size, pos[0] * cell_size, cell_size, cell_size).setBrush(QColor("yellow"))
-
+            path.lineTo(pos[1] + 0.5, pos[0] + 0.5)
+
+        pen = QPen(QColor("yellow"))
+        pen.setWidthF(1.0)
+        pen.setCapStyle(Qt.SquareCap)
+        pen.setJoinStyle(Qt.MiterJoin)
+        cell_size = self.cell_size()
+        # Below one pixel per cell keep the path at least a pixel wide.
+        pen.setCosmetic(cell_size < 1)
+        self.solution_item = scene.addPath(path, pen)
+        self.solution_item.setScale(cell_size)
+        self.solution_item.setZValue(2)
+        self.render_time = time.perf_counter() - started
+
+    def draw_explored(self, overlay):
+        # overlay is the worker's byte-per-cell buffer of the bordered grid.
+        # It is wrapped as an indexed image and shrunk to at most the view's
+        # size before conversion, so a refresh costs about the same however
+        # large the maze is and never touches cells one by one.
+        if self.solver is None:
+            return
+        stride = self.solver.grid.stride
+        image = QImage(overlay, stride, self.solver.height + 2, stride, QImage.Format_Indexed8)
+        image.setColorTable(EXPLORED_COLORS)
+        viewport = self.view.viewport()
+        if image.width() > viewport.width() or image.height() > viewport.height():
+            image = image.scaled(viewport.width(), viewport.height(), Qt.KeepAspectRatio, Qt.FastTransformation)
+        if self.explored_item is None:
+            self.explored_item = self.view.scene().addPixmap(QPixmap())
+            self.explored_item.setTransformationMode(Qt.FastTransformation)
+            self.explored_item.setZValue(1)
+        cell_size = self.cell_size()
+        self.explored_item.setPixmap(QPixmap.fromImage(image))
+        self.explored_item.setScale(cell_size * stride / image.width())
+        self.explored_item.setPos(-cell_size, -cell_size)
+
+    def clear_solution(self):
+        if self.solution_item is not None:
+            self.view.scene().removeItem(self.solution_item)
+            self.solution_item = None
+        if self.explored_item is not None:
+            self.view.scene().removeItem(self.explored_item)
+            self.explored_item = None
+    
     def return_to_home(self):
-        self.close()
-        from welcome import WelcomeWindow
-        self.welcome_window = WelcomeWindow()
-        self.welcome_window.showFullScreen()
+        if self.worker is not None:
+            self.worker.cancel()
+            self.worker.wait()
+        # The window is only hidden, so the loaded maze and drawn solution
+        # are still there when the user comes back.
+        import navigation
+        self.hide()
+        navigation.show_welcome()
 
     def update_method_info(self):
-        self.draw_maze()
+        self.clear_solution()
 
         if self.dfs_radio.isChecked():
             self.info_label.setText("DFS: Expands the deepest node in the frontier.")
         elif self.bfs_radio.isChecked():
             self.info_label.setText("BFS: Expands the shallowest node in the frontier.")
+        elif self.astar_radio.isChecked():
+            self.info_label.setText("A*: Expands the node with the lowest cost plus Manhattan distance to the goal.")
+        elif self.greedy_radio.isChecked():
+            self.info_label.setText("Greedy: Expands the node with the lowest Manhattan distance to the goal.")
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
@@ -1,11 +1,11 @@
 import sys 
 import random
 import os
-from PyQt5.QtCore import Qt, QTimer, QPointF
+from PyQt5.QtCore import Qt, QEvent, QTimer, QPointF, QRect
 from PyQt5.QtWidgets import QMainWindow, QApplication, QLabel, QPushButton, QVBoxLayout, QHBoxLayout, QWidget, QGroupBox
 from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QColor, QPainter
-from ui_main import MainWindow  # Make sure MainWindow is defined in ui_main.py
+from PyQt5.QtGui import QColor, QPainter, QPixmap, QRegion
+import navigation
 
 class Ball:
     def __init__(self, x, y, radius, speed_x, speed_y, color):
@@ -25,19 +25,29 @@ class Ball:
             self.speed_y = -self.speed_y
 
 class AnimatedWindow(QMainWindow):
-    def __init__(self):
+    # mode="sprites" (the default) keeps the balls in NumPy arrays (plain
+    # lists without NumPy), moves them on the timer, blits one pre-rendered
+    # sprite per ball and repaints only the rectangles the balls left and
+    # entered. mode="classic" draws every ball and moves it in paintEvent.
+    # Either way the timer stops while the window is hidden, minimised or not
+    # exposed.
+    def __init__(self, mode="sprites"):
         super().__init__()
         self.setWindowTitle('Bouncing Balls')
         self.setStyleSheet("background-color: black;")
+        self.mode = mode
         self.balls = []
         self.num_balls = 50  # More balls for a fuller background
         self.radius = 20
+        self.color = QColor(255, 200, 120)  # Soft orange
         self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update)
+        self.timer.timeout.connect(self.tick if mode == "sprites" else self.update)
         self.timer.start(30)
         self.setWindowFlags(Qt.FramelessWindowHint)  # Hide window borders
         self.showFullScreen()  # Start in fullscreen mode
         self.create_balls()
+        if mode == "sprites":
+            self.sprite = self.render_sprite()
 
     def create_balls(self):
         for _ in range(self.num_balls):
@@ -45,11 +55,109 @@ class AnimatedWindow(QMainWindow):
             y = random.randint(self.radius, self.height() - self.radius)
             speed_x = random.choice([-1, 1]) * random.uniform(2, 6)
             speed_y = random.choice([-1, 1]) * random.uniform(2, 6)
-            color = QColor(255, 200, 120)  # Soft orange
-            self.balls.append(Ball(x, y, self.radius, speed_x, speed_y, color))
+            self.balls.append(Ball(x, y, self.radius, speed_x, speed_y, self.color))
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        self.numpy = numpy
+        if numpy is not None:
+            self.positions = numpy.array([(ball.x, ball.y) for ball in self.balls], dtype=float)
+            self.velocities = numpy.array([(ball.speed_x, ball.speed_y) for ball in self.balls], dtype=float)
+
+    def render_sprite(self):
+        size = 2 * self.radius + 2
+        sprite = QPixmap(size, size)
+        sprite.fill(Qt.transparent)
+        painter = QPainter(sprite)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(self.color)
+        painter.drawEllipse(QPointF(size / 2, size / 2), self.radius, self.radius)
+        painter.end()
+        return sprite
+
+    def ball_rects(self):
+        # The sprite rectangle of every ball, rounded to whole pixels.
+        size = 2 * self.radius + 2
+        if self.numpy is not None:
+            corners = (self.positions - size / 2).astype(int).tolist()
+        else:
+            corners = [(int(ball.x - size / 2), int(ball.y - size / 2)) for ball in self.balls]
+        return [QRect(x, y, size, size) for x, y in corners]
+
+    def step(self):
+        # One physics step for all balls. A ball only turns around while it
+        # is past an edge and still moving outwards.
+        width, height = self.width(), self.height()
+        if self.numpy is not None:
+            self.positions += self.velocities
+            limits = self.numpy.array([width, height], dtype=float)
+            outside = ((self.positions < self.radius) & (self.velocities < 0)) | \
+                ((self.positions > limits - self.radius) & (self.velocities > 0))
+            self.velocities[outside] *= -1
+            return
+        for ball in self.balls:
+            ball.x += ball.speed_x
+            ball.y += ball.speed_y
+            if (ball.x < ball.radius and ball.speed_x < 0) or (ball.x > width - ball.radius and ball.speed_x > 0):
+                ball.speed_x = -ball.speed_x
+            if (ball.y < ball.radius and ball.speed_y < 0) or (ball.y > height - ball.radius and ball.speed_y > 0):
+                ball.speed_y = -ball.speed_y
+
+    def tick(self):
+        if not self.is_exposed():
+            self.timer.stop()
+            return
+        dirty = QRegion()
+        for rect in self.ball_rects():
+            dirty += rect
+        self.step()
+        for rect in self.ball_rects():
+            dirty += rect
+        self.update(dirty)
+
+    def is_exposed(self):
+        window = self.window()
+        handle = window.windowHandle()
+        if not self.isVisible() or window.isMinimized():
+            return False
+        if handle is not None and not handle.isExposed():
+            return False
+        return not self.visibleRegion().isEmpty()
+
+    def resume(self):
+        if not self.timer.isActive() and self.is_exposed():
+            self.timer.start(30)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.resume()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.timer.stop()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.WindowStateChange:
+            if self.window().isMinimized():
+                self.timer.stop()
+            else:
+                self.resume()
 
     def paintEvent(self, event):
+        # Being asked to paint means the window is exposed again.
+        self.resume()
         painter = QPainter(self)
+        if self.mode == "sprites":
+            area = event.rect()
+            for rect in self.ball_rects():
+                if rect.intersects(area):
+                    painter.drawPixmap(rect.topLeft(), self.sprite)
+            painter.end()
+            return
+
         painter.setRenderHint(QPainter.Antialiasing)
         width = self.width()
         height = self.height()
@@ -183,10 +291,10 @@ class WelcomeWindow(QMainWindow):
         pass  # No longer need to update the background since we're using the animated background
 
     def start_application(self):
-        # Close this window and open the main window
-        self.close()
-        self.main_window = MainWindow()
-        self.main_window.showFullScreen()  # Display in full screen
+        # Hide this window and show the main window, which is only built
+        # (and ui_main imported) the first time
+        self.hide()
+        navigation.show_main()
 
     def close_application(self):
         # Close the application
@@ -194,5 +302,5 @@ class WelcomeWindow(QMainWindow):
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
-    window = WelcomeWindow()
+    navigation.show_welcome()
     sys.exit(app.exec_())